@@ -0,0 +1,37 @@
+"""
+Compara el cálculo de ancho de columnas del Excel (ancho_columna) contra la versión
+original que convertía cada columna entera a str, sobre un reporte sintético.
+
+Uso:
+    python -m benchmarks.bench_ancho_columnas [n_filas]
+"""
+import sys
+import time
+
+from benchmarks.sinteticos import generar_reporte
+from controllers.file_controller import ancho_columna
+
+
+def ancho_original(serie):
+    return max(serie.astype(str).map(len).max(), len(serie.name)) + 2
+
+
+def medir(funcion, df):
+    inicio = time.perf_counter()
+    anchos = [funcion(df[col]) for col in df.columns]
+    return time.perf_counter() - inicio, anchos
+
+
+def main(n_filas):
+    df = generar_reporte(n_filas)
+    t_original, anchos_original = medir(ancho_original, df)
+    t_nuevo, anchos_nuevos = medir(ancho_columna, df)
+    print(f"filas: {n_filas}")
+    print(f"{'columna':<18} {'original':>8} {'nuevo':>6}")
+    for col, a, b in zip(df.columns, anchos_original, anchos_nuevos):
+        print(f"{col:<18} {a:>8} {b:>6}")
+    print(f"original: {t_original:.3f}s  nuevo: {t_nuevo:.3f}s  ({t_original / t_nuevo:.0f}x)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
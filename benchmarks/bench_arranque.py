@@ -0,0 +1,84 @@
+"""
+Mide el arranque de la aplicación en un proceso nuevo:
+  - tiempo de importar main (y que no cargue pandas/numpy/xlsxwriter);
+  - tiempo hasta el primer pintado de la ventana.
+
+Sin display usa la plataforma "offscreen" de Qt. Con --max-segundos falla (código 1)
+si el primer pintado tarda más que ese valor, para detectar regresiones.
+
+Uso:
+    python -m benchmarks.bench_arranque [--repeticiones N] [--max-segundos S]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS_PESADOS = ['pandas', 'numpy', 'xlsxwriter', 'openpyxl']
+
+# Se ejecuta en un proceso nuevo; imprime un JSON con las mediciones.
+_SCRIPT = '''
+import json, sys, time
+inicio = time.perf_counter()
+import main
+importado = time.perf_counter()
+from PyQt5.QtCore import QObject, QEvent
+from PyQt5.QtWidgets import QApplication
+from ui.main_win import MainWindow
+resultado = {
+    'import_main': importado - inicio,
+    'modulos_pesados': [m for m in %r if m in sys.modules],
+}
+class PrimerPintado(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and 'primer_pintado' not in resultado:
+            resultado['primer_pintado'] = time.perf_counter() - inicio
+            app.quit()
+        return False
+app = QApplication(sys.argv)
+window = MainWindow()
+filtro = PrimerPintado()
+window.installEventFilter(filtro)
+window.show()
+app.exec_()
+print(json.dumps(resultado))
+''' % (MODULOS_PESADOS,)
+
+
+def medir_arranque():
+    entorno = dict(os.environ)
+    if sys.platform.startswith('linux') and not entorno.get('DISPLAY'):
+        entorno.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    salida = subprocess.run(
+        [sys.executable, '-c', _SCRIPT], cwd=RAIZ, env=entorno,
+        capture_output=True, text=True, check=True, timeout=60
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--max-segundos', type=float, help="Umbral para el primer pintado (mediana)")
+    args = parser.parse_args()
+
+    mediciones = [medir_arranque() for _ in range(args.repeticiones)]
+    import_main = statistics.median(m['import_main'] for m in mediciones)
+    primer_pintado = statistics.median(m['primer_pintado'] for m in mediciones)
+    pesados = sorted({mod for m in mediciones for mod in m['modulos_pesados']})
+
+    print(f"import main:     {import_main * 1000:.0f} ms (mediana de {args.repeticiones})")
+    print(f"primer pintado:  {primer_pintado * 1000:.0f} ms")
+    print(f"stack de datos cargado al arrancar: {', '.join(pesados) or 'ninguno'}")
+
+    if pesados or (args.max_segundos is not None and primer_pintado > args.max_segundos):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Compara comparar_dataframes completo contra comparar_incremental cuando solo cambia
+el TXT de una sucursal de N, y verifica que ambos reportes sean iguales.
+
+Uso:
+    python -m benchmarks.bench_incremental [n_sucursales] [filas_por_sucursal]
+"""
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+import pandas as pd
+
+from benchmarks.sinteticos import generar_pedidos_llegadas, generar_texto_txt, generar_zip
+from controllers.file_controller import crc_por_sucursal, procesar_zip_a_dataframe
+from services.comparador import comparar_dataframes
+from services.incremental import comparar_incremental
+
+
+# Las llegadas no cambian entre corridas: misma huella de archivo (ver cache.hash_archivo)
+HUELLA_LLEGADAS = 'llegadas sin cambios'
+
+
+def main(n_sucursales, filas_por_sucursal):
+    _, df_llegadas = generar_pedidos_llegadas(n_sucursales, filas_por_sucursal)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_zip = generar_zip(os.path.join(tmp, 'pedidos.zip'), n_sucursales, filas_por_sucursal)
+        estado = os.path.join(tmp, 'estado.pkl')
+        comparar_incremental(
+            procesar_zip_a_dataframe(ruta_zip), df_llegadas.copy(), estado, crc_por_sucursal(ruta_zip),
+            HUELLA_LLEGADAS
+        )
+
+        # Cambia el TXT de una sola sucursal
+        with zipfile.ZipFile(ruta_zip) as original:
+            miembros = {info.filename: original.read(info) for info in original.infolist()}
+        nombre = next(n for n in miembros if 'Suc. 1 ' in n)
+        miembros[nombre] = generar_texto_txt(filas_por_sucursal, semilla=999).encode('utf-8')
+        with zipfile.ZipFile(ruta_zip, 'w', zipfile.ZIP_DEFLATED) as nuevo:
+            for n, datos in miembros.items():
+                nuevo.writestr(n, datos)
+        df_pedidos = procesar_zip_a_dataframe(ruta_zip)
+
+        inicio = time.perf_counter()
+        completo = comparar_dataframes(df_pedidos.copy(), df_llegadas.copy())
+        t_completo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        incremental, recalculadas = comparar_incremental(
+            df_pedidos.copy(), df_llegadas.copy(), estado, crc_por_sucursal(ruta_zip), HUELLA_LLEGADAS
+        )
+        t_incremental = time.perf_counter() - inicio
+
+    # Los valores tienen que ser iguales; el orden del diccionario de PRODUCTO puede variar
+    pd.testing.assert_frame_equal(completo, incremental, check_categorical=False)
+    print(f"{n_sucursales} sucursales x {filas_por_sucursal} filas, recalculadas: {recalculadas}")
+    print(f"completo: {t_completo:.3f}s  incremental: {t_incremental:.3f}s  "
+          f"({t_incremental / t_completo:.0%} del tiempo completo)")
+
+
+if __name__ == '__main__':
+    argumentos = [int(a) for a in sys.argv[1:]]
+    main(*(argumentos or [30, 20_000]))
@@ -0,0 +1,50 @@
+"""
+Compara el parser de ancho fijo columnar contra el bucle línea a línea original.
+
+Uso:
+    python -m benchmarks.bench_parser_txt [n_lineas ...]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.sinteticos import generar_texto_txt
+from services.parser_txt import parsear_txt_pedidos
+
+
+def parsear_bucle(texto):
+    """Implementación original: slicing por línea + conversión numérica posterior."""
+    data = []
+    for line in texto.splitlines(keepends=True):
+        codebar = line[:13].strip()
+        troquel = line[13:20].strip()
+        descripcion = line[20:50].strip()
+        cantidad = line[50:].strip()
+        data.append([codebar, troquel, descripcion, cantidad])
+    df = pd.DataFrame(data, columns=['CODBARRA', 'TROQUEL', 'DESCRIPCION', 'CANTIDAD_PEDIDA'])
+    for col in ['CODBARRA', 'TROQUEL', 'CANTIDAD_PEDIDA']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def medir(funcion, texto, repeticiones=3):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(texto)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main(tamanos):
+    print(f"{'lineas':>10} {'bucle (s)':>10} {'columnar (s)':>13} {'speedup':>8}")
+    for n in tamanos:
+        texto = generar_texto_txt(n)
+        t_bucle = medir(parsear_bucle, texto)
+        t_columnar = medir(parsear_txt_pedidos, texto)
+        print(f"{n:>10} {t_bucle:>10.3f} {t_columnar:>13.3f} {t_bucle / t_columnar:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
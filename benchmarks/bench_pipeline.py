@@ -0,0 +1,166 @@
+"""
+Mide cada etapa de la conciliación (lectura del ZIP, lectura del CSV, comparación y
+exportación a Excel y a los demás formatos disponibles) sobre entradas sintéticas de
+10k, 1M y 10M filas: tiempo de reloj y pico de memoria (tracemalloc). Guarda los
+resultados en un JSON para poder comparar corridas.
+
+El pico de memoria se mide en una segunda pasada, porque tracemalloc hace más lento
+el código y distorsionaría los tiempos. Con --comparar se contrasta contra un JSON
+anterior y se termina con código 1 si alguna etapa empeoró más que la tolerancia.
+
+Uso:
+    python -m benchmarks.bench_pipeline [--filas 10000 1000000 10000000] [--salida res.json]
+                                        [--sin-memoria] [--comparar base.json] [--tolerancia 0.10]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.sinteticos import generar_entradas
+from controllers.export_controller import EXPORTADORES, rutas_de_salida, validar_formatos
+from controllers.file_controller import (
+    MAX_FILAS_EXCEL, export_excel_with_style, leer_csv_desde_fila_11, procesar_zip_a_dataframe
+)
+from services.comparador import comparar_dataframes
+
+ESCALAS = [10_000, 1_000_000, 10_000_000]
+
+
+def _formatos_alternativos():
+    """Formatos de export_controller distintos de xlsx que se pueden usar en este entorno."""
+    disponibles = []
+    for formato in EXPORTADORES:
+        try:
+            validar_formatos([formato])
+        except ValueError:
+            continue
+        if formato != 'xlsx':
+            disponibles.append(formato)
+    return disponibles
+
+
+def _medir(funcion, con_memoria):
+    """Ejecuta funcion() y retorna (resultado, segundos, pico_mb)."""
+    if con_memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion()
+    finally:
+        segundos = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1] if con_memoria else None
+        if con_memoria:
+            tracemalloc.stop()
+    return resultado, segundos, None if pico is None else round(pico / 2**20, 1)
+
+
+def _etapas(ruta_zip, ruta_csv, carpeta, con_memoria):
+    """Corre el pipeline completo midiendo cada etapa. Retorna {etapa: (segundos, pico_mb)}."""
+    medidas = {}
+    df_pedidos, *medidas['zip'] = _medir(lambda: procesar_zip_a_dataframe(ruta_zip), con_memoria)
+    df_llegadas, *medidas['csv'] = _medir(lambda: leer_csv_desde_fila_11(ruta_csv), con_memoria)
+    df_resultado, *medidas['comparar'] = _medir(
+        lambda: comparar_dataframes(df_pedidos, df_llegadas), con_memoria
+    )
+    if len(df_resultado) <= MAX_FILAS_EXCEL:
+        destino = os.path.join(carpeta, 'reporte.xlsx')
+        _, *medidas['exportar'] = _medir(lambda: export_excel_with_style(df_resultado, destino), con_memoria)
+    for formato, ruta in rutas_de_salida(os.path.join(carpeta, 'reporte'), _formatos_alternativos()).items():
+        exportador = EXPORTADORES[formato][1]
+        _, *medidas[f'exportar_{formato}'] = _medir(lambda: exportador(df_resultado, ruta), con_memoria)
+    return medidas, len(df_pedidos), len(df_llegadas), len(df_resultado)
+
+
+def medir_escala(filas, con_memoria=True):
+    with tempfile.TemporaryDirectory() as tmp:
+        inicio = time.perf_counter()
+        ruta_zip, ruta_csv = generar_entradas(tmp, filas)
+        generacion = time.perf_counter() - inicio
+
+        tiempos, n_pedidos, n_llegadas, n_reporte = _etapas(ruta_zip, ruta_csv, tmp, con_memoria=False)
+        memoria = _etapas(ruta_zip, ruta_csv, tmp, con_memoria=True)[0] if con_memoria else {}
+
+    etapas = {
+        etapa: {'segundos': round(segundos, 3), 'pico_mb': memoria.get(etapa, (None, None))[1]}
+        for etapa, (segundos, _) in tiempos.items()
+    }
+    return {
+        'filas': filas,
+        'filas_pedidos': n_pedidos,
+        'filas_llegadas': n_llegadas,
+        'filas_reporte': n_reporte,
+        'segundos_generacion': round(generacion, 1),
+        'etapas': etapas,
+    }
+
+
+def comparar(actual, base, tolerancia):
+    """Imprime la relación actual/base por etapa y retorna las regresiones encontradas."""
+    previas = {r['filas']: r['etapas'] for r in base['resultados']}
+    regresiones = []
+    for resultado in actual['resultados']:
+        for etapa, medida in resultado['etapas'].items():
+            previa = previas.get(resultado['filas'], {}).get(etapa)
+            if not previa:
+                continue
+            for metrica in ('segundos', 'pico_mb'):
+                if not medida[metrica] or not previa[metrica]:
+                    continue
+                relacion = medida[metrica] / previa[metrica]
+                marca = ''
+                if relacion > 1 + tolerancia:
+                    marca = '  <-- regresión'
+                    regresiones.append((resultado['filas'], etapa, metrica, relacion))
+                print(f"{resultado['filas']:>10} {etapa:<16} {metrica:<9} "
+                      f"{previa[metrica]:>9} -> {medida[metrica]:>9} ({relacion:.2f}x){marca}")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del pipeline de conciliación")
+    parser.add_argument('--filas', type=int, nargs='+', default=ESCALAS, help="Escalas a medir")
+    parser.add_argument('--salida', default='bench_pipeline.json', help="JSON donde guardar los resultados")
+    parser.add_argument('--sin-memoria', action='store_true', help="No medir el pico de memoria (más rápido)")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help="Empeoramiento relativo aceptado al comparar (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    actual = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'resultados': [],
+    }
+    for filas in args.filas:
+        resultado = medir_escala(filas, con_memoria=not args.sin_memoria)
+        actual['resultados'].append(resultado)
+        print(f"{filas:>10} filas: " + '  '.join(
+            f"{etapa} {m['segundos']:.2f}s" + (f"/{m['pico_mb']}MB" if m['pico_mb'] is not None else '')
+            for etapa, m in resultado['etapas'].items()
+        ))
+
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(actual, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        if comparar(actual, base, args.tolerancia):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
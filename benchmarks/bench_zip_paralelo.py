@@ -0,0 +1,45 @@
+"""
+Mide cómo escala procesar_zip_a_dataframe en modo paralelo según la cantidad
+de miembros del ZIP y de workers, y verifica que el resultado sea idéntico
+al del recorrido secuencial.
+
+Uso:
+    python -m benchmarks.bench_zip_paralelo [lineas_por_miembro]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.sinteticos import generar_zip
+from controllers.file_controller import procesar_zip_a_dataframe
+
+MIEMBROS = [4, 16, 64]
+WORKERS = [2, 4, 8]
+
+
+def medir(**kwargs):
+    inicio = time.perf_counter()
+    df = procesar_zip_a_dataframe(**kwargs)
+    return time.perf_counter() - inicio, df
+
+
+def main(lineas_por_miembro):
+    print(f"CPUs: {os.cpu_count()}  lineas por miembro: {lineas_por_miembro}")
+    encabezado = f"{'miembros':>8} {'secuencial':>10}" + ''.join(f" {f'{w} procesos':>11}" for w in WORKERS)
+    print(encabezado)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in MIEMBROS:
+            ruta = generar_zip(os.path.join(tmp, f'pedidos_{n}.zip'), n, lineas_por_miembro)
+            t_seq, df_seq = medir(zip_path=ruta)
+            fila = f"{n:>8} {t_seq:>9.2f}s"
+            for w in WORKERS:
+                t_par, df_par = medir(zip_path=ruta, workers=w)
+                if not df_par.equals(df_seq):
+                    raise AssertionError(f"Resultado distinto con {w} workers y {n} miembros")
+                fila += f" {t_par:>6.2f}s {t_seq / t_par:>3.1f}x"
+            print(fila)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,167 @@
+import os
+import random
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+def generar_texto_txt(n_lineas, n_productos=5000, semilla=0):
+    """
+    Genera el contenido de un TXT de pedidos de sucursal con el formato de ancho fijo
+    (CODBARRA 13 | TROQUEL 7 | DESCRIPCION 30 | CANTIDAD).
+    """
+    rnd = random.Random(semilla)
+    lineas = []
+    for _ in range(n_lineas):
+        i = rnd.randrange(n_productos)
+        descripcion = f"PRODUCTO {i} X 30 COMP"[:30]
+        lineas.append(f"{7790000000000 + i:<13}{100000 + i:<7}{descripcion:<30}{rnd.randint(1, 50)}\n")
+    return ''.join(lineas)
+
+
+def generar_zip(ruta_zip, n_miembros, lineas_por_miembro, fecha='20250301', semilla=0):
+    """
+    Genera un ZIP de pedidos con un TXT por sucursal, nombrado como
+    "Pedido Suc. N Fecha YYYYMMDD.txt".
+    """
+    with zipfile.ZipFile(ruta_zip, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for sucursal in range(1, n_miembros + 1):
+            zip_ref.writestr(
+                f"Pedido Suc. {sucursal} Fecha {fecha}.txt",
+                generar_texto_txt(lineas_por_miembro, semilla=semilla + sucursal)
+            )
+    return ruta_zip
+
+
+def generar_reporte(n_filas, n_sucursales=30, semilla=0):
+    """
+    Genera un DataFrame con las columnas y tipos del resultado de comparar_dataframes,
+    para medir la exportación sin pasar por la ingesta.
+    """
+    rng = np.random.default_rng(semilla)
+    troquel = rng.integers(100000, 105000, n_filas)
+    pedida = rng.integers(0, 20, n_filas)
+    enviada = rng.integers(0, 20, n_filas)
+    envio = pd.Timestamp('2025-03-01') + pd.to_timedelta(rng.integers(0, 30 * 24, n_filas), unit='h')
+    recepcion = pd.Series(envio + pd.Timedelta(days=1)).mask(rng.random(n_filas) < 0.1)
+    estados = ['NO PEDIDO', 'NO ENVIADO', 'COMPLETO', 'INCOMPLETO', 'ERRONEO']
+    return pd.DataFrame({
+        'SUCURSAL': np.sort(rng.integers(1, n_sucursales + 1, n_filas)).astype('int16'),
+        'CODBARRA': 7790000000000 + troquel - 100000,
+        'TROQUEL': troquel.astype('int32'),
+        'PRODUCTO': [f"PRODUCTO {t} X 30 COMP" for t in troquel],
+        'CANTIDAD PEDIDA': pedida,
+        'CANTIDAD ENVIADA': enviada,
+        'DIFERENCIAS': enviada - pedida,
+        'NUMERO DE ENVIO': rng.integers(1, 99999, n_filas).astype(float),
+        'FECHA DE ENVIO': envio,
+        'FECHA RECEPCION': recepcion.to_numpy(),
+        'ESTADO': pd.Categorical.from_codes(rng.integers(0, 5, n_filas), categories=estados),
+    })
+
+
+def generar_pedidos_llegadas(n_sucursales, filas_por_sucursal, n_productos=5000, semilla=0):
+    """
+    Genera (df_pedidos, df_llegadas) ya parseados, con las columnas y tipos que devuelven
+    procesar_zip_a_dataframe y leer_csv_desde_fila_11, para medir la comparación sola.
+    """
+    rng = np.random.default_rng(semilla)
+    n = n_sucursales * filas_por_sucursal
+    sucursal = np.repeat(np.arange(1, n_sucursales + 1), filas_por_sucursal).astype('int16')
+    producto = rng.integers(0, n_productos, n)
+    descripciones = np.array([f"PRODUCTO {i} X 30 COMP" for i in range(n_productos)], dtype=object)
+    df_pedidos = pd.DataFrame({
+        'CODBARRA': pd.array(7790000000000 + producto, dtype='Int64'),
+        'TROQUEL': (100000 + producto).astype('int32'),
+        'DESCRIPCION': descripciones[producto],
+        'CANTIDAD_PEDIDA': pd.array(rng.integers(1, 20, n), dtype='Int64'),
+        'SUCURSAL': sucursal,
+        'Fecha_Envio': pd.Categorical(['2025/03/01'] * n),
+    })
+
+    producto = rng.integers(0, n_productos, n)
+    envio = pd.Timestamp('2025-03-01') + pd.to_timedelta(rng.integers(0, 72, n), unit='h')
+    df_llegadas = pd.DataFrame({
+        'SUCURSAL': sucursal,
+        'TROQUEL': (100000 + producto).astype('int32'),
+        'CANTIDAD_ENVIADA': rng.integers(1, 20, n).astype(float),
+        'NUMERO_ENVIO': pd.array(rng.integers(1, 99999, n), dtype='Int64'),
+        'FECHA_ENVIO': envio,
+        'FECHA_RECEPCION': pd.Series(envio + pd.Timedelta(days=1)).mask(rng.random(n) < 0.1).to_numpy(),
+        'ESTADO_LLEGADA': 'Recibido',
+        'DESCRIPCION_LLEGADA': descripciones[producto],
+    })
+    return df_pedidos, df_llegadas
+
+
+# Cabecera real del CSV intersucursal (fila 11 del archivo)
+CABECERA_CSV = [
+    'Operación', 'Número', 'Estado', 'Origen', 'Destino', 'Fecha Envio', 'Fecha Recepcion',
+    'Operador Envio', 'Operador Recepcion', 'Troquel', 'Producto', 'Cantidad', 'Unidades',
+    'CantidadRecibida', 'UnidadesRecibidas', 'Importe',
+]
+
+_ROMANOS = [(1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'), (100, 'C'), (90, 'XC'),
+            (50, 'L'), (40, 'XL'), (10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')]
+
+
+def _a_romano(numero):
+    texto = ''
+    for valor, simbolo in _ROMANOS:
+        cantidad, numero = divmod(numero, valor)
+        texto += simbolo * cantidad
+    return texto
+
+
+def generar_csv_llegadas(ruta_csv, n_sucursales, filas_por_sucursal, n_productos=5000, semilla=0):
+    """
+    Genera un CSV intersucursal como el que exporta el sistema: 10 líneas de preámbulo,
+    la cabecera en la fila 11, separador ';', coma decimal y encoding latin-1, con
+    destinos "S. ANTONIOLLI <romano>". Se escribe de a una sucursal para no tener
+    todo el archivo en memoria.
+    """
+    rng = np.random.default_rng(semilla)
+    descripciones = np.array([f"PRODUCTO {i} X 30 COMP" for i in range(n_productos)], dtype=object)
+    with open(ruta_csv, 'w', encoding='latin-1', newline='') as f:
+        f.write('Reporte de movimientos intersucursal;;;\n')
+        for i in range(1, 10):
+            f.write(f'Línea de encabezado {i};;;\n')
+        f.write(';'.join(CABECERA_CSV) + '\n')
+        for sucursal in range(1, n_sucursales + 1):
+            n = filas_por_sucursal
+            producto = rng.integers(0, n_productos, n)
+            cantidad = rng.integers(1, 20, n)
+            envio = pd.Timestamp('2025-03-01 08:00') + pd.to_timedelta(rng.integers(0, 72, n), unit='h')
+            recepcion = pd.Series(envio + pd.Timedelta(days=1)).mask(rng.random(n) < 0.1)
+            pd.DataFrame({
+                'Operación': 'ENVIO',
+                'Número': rng.integers(1, 99999, n),
+                'Estado': 'Recibido',
+                'Origen': 'CENTRAL',
+                'Destino': f'S. ANTONIOLLI {_a_romano(sucursal)}',
+                'Fecha Envio': envio,
+                'Fecha Recepcion': recepcion.to_numpy(),
+                'Operador Envio': 'op1',
+                'Operador Recepcion': 'op2',
+                'Troquel': 100000 + producto,
+                'Producto': descripciones[producto],
+                'Cantidad': cantidad,
+                'Unidades': cantidad,
+                'CantidadRecibida': cantidad,
+                'UnidadesRecibidas': cantidad,
+                'Importe': cantidad * 10.5,
+            }).to_csv(f, sep=';', decimal=',', header=False, index=False, date_format='%d/%m/%Y %H:%M')
+    return ruta_csv
+
+
+def generar_entradas(carpeta, filas, n_sucursales=30, semilla=0):
+    """
+    Genera en la carpeta un par (ZIP de pedidos, CSV de llegadas) con aproximadamente
+    "filas" filas cada uno, repartidas entre n_sucursales. Retorna (ruta_zip, ruta_csv).
+    """
+    filas_por_sucursal = max(1, filas // n_sucursales)
+    ruta_zip = generar_zip(os.path.join(carpeta, 'pedidos.zip'), n_sucursales, filas_por_sucursal, semilla=semilla)
+    ruta_csv = generar_csv_llegadas(os.path.join(carpeta, 'llegadas.csv'), n_sucursales, filas_por_sucursal,
+                                    semilla=semilla)
+    return ruta_zip, ruta_csv
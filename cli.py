@@ -0,0 +1,214 @@
+"""
+Entrada por línea de comandos, sin interfaz gráfica (no importa PyQt5).
+
+Ejemplos:
+    python cli.py procesar --manifiesto pares.json --salida reportes/ --workers 4
+    python cli.py procesar --zip "entradas/*.zip" --csv "entradas/*.csv" --salida reportes/
+    python cli.py cache limpiar
+    python cli.py historial --db historial.db --sucursal 12 --estado INCOMPLETO
+    python cli.py vigilar --carpeta entradas/ --salida reportes/ --workers 2 --formato xlsx html
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+from controllers.batch_controller import emparejar_por_nombre, leer_manifiesto, procesar_lote
+from controllers.export_controller import EXPORTADORES, validar_formatos
+from controllers.watch_controller import VigilanteCarpeta
+from services.cache import LIMITE_POR_DEFECTO, CacheParseo
+from services.comparador import ESTADOS
+from services.historial import HistorialResultados
+from services.instrumentacion import guardar_chrome_trace
+
+
+def comando_procesar(args):
+    if args.manifiesto:
+        pares = leer_manifiesto(args.manifiesto)
+    elif args.zip and args.csv:
+        pares = emparejar_por_nombre(args.zip, args.csv)
+    else:
+        raise SystemExit("Indicá --manifiesto o bien --zip y --csv")
+    try:
+        validar_formatos(args.formato)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.periodo:
+        for par in pares:
+            par.setdefault('periodo', args.periodo)
+
+    cache = None if args.sin_cache else crear_cache(args)
+    perfil = args.perfil or ('rss' if args.traza else None)
+    resumenes = procesar_lote(
+        pares, args.salida, workers=args.workers, por_sucursal=args.por_sucursal, cache=cache,
+        carpeta_incremental=args.incremental_dir, ruta_historial=args.historial, perfil=perfil,
+        formatos=args.formato, csv_chunksize=args.csv_chunksize
+    )
+
+    # Las mediciones sueltas van solo a la traza; en el resumen quedan las etapas agrupadas
+    eventos = [(r['zip'], r.pop('eventos')) for r in resumenes if 'eventos' in r]
+    if args.traza:
+        guardar_chrome_trace(args.traza, eventos)
+        print(f"Traza guardada en {args.traza} (abrir con chrome://tracing o Perfetto)")
+
+    ruta_resumen = args.resumen or os.path.join(args.salida, 'resumen.json')
+    with open(ruta_resumen, 'w', encoding='utf-8') as f:
+        json.dump({'pares': resumenes}, f, ensure_ascii=False, indent=2)
+
+    errores = [r for r in resumenes if r['estado'] != 'ok']
+    for r in resumenes:
+        detalle = f"{r['filas']} filas" if r['estado'] == 'ok' else r['error']
+        destinos = ', '.join(r.get('archivos', [r['reporte']]))
+        print(f"[{r['estado']}] {r['zip']} -> {destinos} ({detalle}, {r['segundos']}s)")
+        for etapa in r.get('etapas', []):
+            memoria = f"RSS {etapa['rss_delta_mb']:+} MB (al terminar {etapa['rss_fin_mb']} MB)" \
+                if etapa['rss_delta_mb'] is not None else "RSS no disponible"
+            if etapa['tracemalloc_pico_mb'] is not None:
+                memoria += f", tracemalloc {etapa['tracemalloc_pico_mb']} MB"
+            print(f"    {'  ' * etapa['profundidad']}{etapa['nombre']}: {etapa['segundos']}s, {memoria}")
+    print(f"{len(resumenes) - len(errores)}/{len(resumenes)} pares procesados. Resumen: {ruta_resumen}")
+    return 1 if errores else 0
+
+
+def crear_cache(args):
+    return CacheParseo(args.cache_dir, limite_bytes=int(args.cache_limite_mb * 1024 ** 2))
+
+
+def comando_cache(args):
+    cache = crear_cache(args)
+    if args.accion == 'limpiar':
+        print(f"{cache.limpiar()} entradas borradas de {cache.directorio}")
+    else:
+        entradas, ocupado = cache.tamano()
+        print(f"{cache.directorio}: {entradas} entradas, {ocupado / 1024 ** 2:.1f} MB "
+              f"(límite {cache.limite_bytes / 1024 ** 2:.0f} MB)")
+    return 0
+
+
+def comando_historial(args):
+    historial = HistorialResultados(args.db)
+    if args.periodos:
+        print('\n'.join(historial.periodos()))
+        return 0
+    df = historial.consultar(
+        sucursal=args.sucursal, troquel=args.troquel, estado=args.estado,
+        desde=args.desde, hasta=args.hasta, limite=args.limite
+    )
+    if args.exportar:
+        df.to_csv(args.exportar, index=False, sep=';', decimal=',', encoding='latin-1')
+        print(f"{len(df)} filas exportadas a {args.exportar}")
+    else:
+        print(df.to_string(index=False))
+    return 0
+
+
+def comando_vigilar(args):
+    try:
+        validar_formatos(args.formato)
+        vigilante = VigilanteCarpeta(
+            args.carpeta, args.salida, workers=args.workers, espera=args.espera,
+            formatos=args.formato, por_sucursal=args.por_sucursal,
+            cache=None if args.sin_cache else crear_cache(args),
+            carpeta_incremental=args.incremental_dir, ruta_historial=args.historial,
+            csv_chunksize=args.csv_chunksize
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"Vigilando {args.carpeta} (diario: {vigilante.ruta_diario}). Ctrl+C para salir.")
+    try:
+        vigilante.vigilar(intervalo=args.intervalo, una_vez=args.una_vez)
+    except KeyboardInterrupt:
+        # Los pares que quedaron a medias figuran en el diario solo con 'inicio' y se
+        # vuelven a procesar al reiniciar
+        print("Vigilancia interrumpida")
+    return 0
+
+
+def agregar_opcion_csv_chunksize(parser):
+    parser.add_argument('--csv-chunksize', type=int,
+                        help="Leer el CSV intersucursal en bloques de esta cantidad de filas "
+                             "(para archivos que no entran en memoria)")
+
+
+def agregar_opciones_cache(parser):
+    parser.add_argument('--cache-dir', help="Carpeta del cache de parseo (por defecto la del usuario)")
+    parser.add_argument('--cache-limite-mb', type=float, default=LIMITE_POR_DEFECTO / 1024 ** 2,
+                        help="Tamaño máximo del cache; se borran primero las entradas menos usadas")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Comparador de faltas: pedidos de sucursal vs. envíos intersucursal")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p = subparsers.add_parser('procesar', help="Procesar uno o más pares ZIP/CSV")
+    p.add_argument('--manifiesto', help="JSON o CSV con los pares (columnas zip, csv y opcional salida)")
+    p.add_argument('--zip', help="Glob de ZIPs de pedidos; se emparejan con --csv por nombre base")
+    p.add_argument('--csv', help="Glob de CSVs intersucursal")
+    p.add_argument('--salida', required=True, help="Carpeta donde se escriben los reportes")
+    p.add_argument('--resumen', help="Ruta del resumen JSON (por defecto <salida>/resumen.json)")
+    p.add_argument('--workers', type=int, default=1, help="Pares a procesar en paralelo")
+    p.add_argument('--por-sucursal', action='store_true',
+                   help="Una hoja por SUCURSAL en cada reporte xlsx (los demás formatos no tienen hojas y lo ignoran)")
+    p.add_argument('--sin-cache', action='store_true', help="No usar el cache de parseo")
+    p.add_argument('--incremental-dir',
+                   help="Carpeta con el estado de corridas anteriores: solo se recalculan las sucursales que cambiaron")
+    agregar_opciones_cache(p)
+    agregar_opcion_csv_chunksize(p)
+    p.add_argument('--historial', help="Base SQLite donde agregar los resultados de cada par")
+    p.add_argument('--periodo', help="Período para el historial (por defecto, la primera fecha de envío)")
+    p.add_argument('--formato', nargs='+', choices=list(EXPORTADORES), default=['xlsx'],
+                   help="Formatos del reporte; se pueden pedir varios (por defecto xlsx)")
+    p.add_argument('--perfil', choices=['rss', 'tracemalloc'],
+                   help="Medir tiempo, filas y memoria de cada etapa (se agregan al resumen JSON)")
+    p.add_argument('--traza', help="Guardar las etapas medidas como traza de Chrome en este archivo")
+    p.set_defaults(funcion=comando_procesar)
+
+    p = subparsers.add_parser('cache', help="Ver o invalidar el cache de parseo")
+    p.add_argument('accion', choices=['info', 'limpiar'])
+    agregar_opciones_cache(p)
+    p.set_defaults(funcion=comando_cache)
+
+    p = subparsers.add_parser('historial', help="Consultar el historial de resultados")
+    p.add_argument('--db', required=True, help="Base SQLite del historial")
+    p.add_argument('--sucursal', type=int)
+    p.add_argument('--troquel', type=int)
+    p.add_argument('--estado', choices=ESTADOS)
+    p.add_argument('--desde', help="Primer período (inclusive)")
+    p.add_argument('--hasta', help="Último período (inclusive)")
+    p.add_argument('--limite', type=int, help="Cantidad máxima de filas")
+    p.add_argument('--periodos', action='store_true', help="Listar los períodos guardados")
+    p.add_argument('--exportar', help="Guardar el resultado en este CSV en lugar de mostrarlo")
+    p.set_defaults(funcion=comando_historial)
+
+    p = subparsers.add_parser('vigilar', help="Procesar los pares ZIP/CSV que van llegando a una carpeta")
+    p.add_argument('--carpeta', required=True, help="Carpeta donde llegan los ZIPs y CSVs (se emparejan por fecha)")
+    p.add_argument('--salida', required=True, help="Carpeta de los reportes y del diario (distinta de --carpeta)")
+    p.add_argument('--intervalo', type=float, default=10, help="Segundos entre revisiones de la carpeta")
+    p.add_argument('--espera', type=float, default=30,
+                   help="Segundos que un archivo tiene que quedar sin cambios para considerarlo completo")
+    p.add_argument('--workers', type=int, default=1, help="Pares a procesar en paralelo")
+    p.add_argument('--formato', nargs='+', choices=list(EXPORTADORES), default=['xlsx'],
+                   help="Formatos de salida de cada reporte")
+    p.add_argument('--por-sucursal', action='store_true',
+                   help="Una hoja por SUCURSAL en cada reporte xlsx (los demás formatos no tienen hojas y lo ignoran)")
+    p.add_argument('--sin-cache', action='store_true', help="No usar el cache de parseo")
+    p.add_argument('--incremental-dir',
+                   help="Carpeta de estado para recalcular solo las sucursales que cambiaron")
+    p.add_argument('--historial', help="Base SQLite donde agregar los resultados de cada par")
+    p.add_argument('--una-vez', action='store_true',
+                   help="Procesar lo que ya está completo en la carpeta y salir")
+    agregar_opciones_cache(p)
+    agregar_opcion_csv_chunksize(p)
+    p.set_defaults(funcion=comando_vigilar)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from controllers.export_controller import rutas_de_salida
+from controllers.process_controller import ejecutar
+from services.historial import HistorialResultados
+from services.instrumentacion import Instrumentacion
+
+
+def leer_manifiesto(ruta_manifiesto):
+    """
+    Lee un manifiesto de pares ZIP/CSV. Puede ser:
+      - JSON: lista de objetos {"zip": ..., "csv": ..., "salida": ...}
+      - CSV: con cabecera zip,csv[,salida]
+    "salida" y "periodo" (para el historial) son opcionales. Las rutas relativas se toman
+    desde la carpeta del manifiesto.
+    """
+    base = os.path.dirname(os.path.abspath(ruta_manifiesto))
+    with open(ruta_manifiesto, encoding='utf-8') as f:
+        if ruta_manifiesto.lower().endswith('.json'):
+            filas = json.load(f)
+        else:
+            filas = list(csv.DictReader(f))
+
+    pares = []
+    for i, fila in enumerate(filas, start=1):
+        if not fila.get('zip') or not fila.get('csv'):
+            raise ValueError(f"Manifiesto {ruta_manifiesto}: la entrada {i} no tiene 'zip' y 'csv'")
+        par = {clave: os.path.join(base, fila[clave]) for clave in ('zip', 'csv')}
+        if fila.get('salida'):
+            par['salida'] = os.path.join(base, fila['salida'])
+        if fila.get('periodo'):
+            par['periodo'] = str(fila['periodo'])
+        pares.append(par)
+    return pares
+
+
+def emparejar_por_nombre(patron_zip, patron_csv):
+    """
+    Arma los pares a partir de dos globs, emparejando ZIP y CSV con el mismo nombre
+    base (ej. semana_10.zip con semana_10.csv). Los archivos sin pareja se informan
+    con ValueError.
+    """
+    def por_nombre(patron):
+        return {os.path.splitext(os.path.basename(r))[0]: r for r in glob.glob(patron)}
+
+    zips, csvs = por_nombre(patron_zip), por_nombre(patron_csv)
+    sin_pareja = sorted(set(zips) ^ set(csvs))
+    if sin_pareja:
+        raise ValueError(f"Archivos sin pareja ZIP/CSV: {', '.join(sin_pareja)}")
+    return [{'zip': zips[nombre], 'csv': csvs[nombre]} for nombre in sorted(zips)]
+
+
+def periodo_por_defecto(df_resultado):
+    """Período del historial si no se indica otro: la primera FECHA DE ENVIO (YYYY-MM-DD)."""
+    primera = df_resultado['FECHA DE ENVIO'].min()
+    return (primera if pd.notna(primera) else pd.Timestamp.today()).strftime('%Y-%m-%d')
+
+
+def procesar_par(par, carpeta_salida, por_sucursal=False, cache=None, carpeta_incremental=None,
+                 ruta_historial=None, perfil=None, formatos=('xlsx',), csv_chunksize=None):
+    """
+    Corre el proceso completo para un par y devuelve su resumen (nunca lanza excepciones:
+    los errores quedan registrados en el resumen).
+
+    Con carpeta_incremental se guarda ahí el estado de cada reporte (por nombre del
+    reporte) y las corridas siguientes hacia el mismo reporte solo recalculan las
+    sucursales que cambiaron.
+
+    Con ruta_historial el resultado se agrega a esa base de historial, con el período
+    del par (o periodo_por_defecto) y el nombre del reporte como fuente.
+
+    Con perfil ('rss' o 'tracemalloc') se instrumenta cada etapa y el resumen incluye
+    'etapas' (agrupadas por nombre) y 'eventos' (cada medición, para armar una traza).
+
+    El reporte se escribe en cada uno de los formatos; 'archivos' lista los generados.
+    Con csv_chunksize el CSV se lee en bloques de esa cantidad de filas.
+    """
+    nombre = os.path.splitext(os.path.basename(par['zip']))[0]
+    destino = par.get('salida') or os.path.join(carpeta_salida, f"{nombre}_reporte.xlsx")
+    resumen = {'zip': par['zip'], 'csv': par['csv'], 'reporte': destino}
+    estado = None
+    if carpeta_incremental:
+        estado = os.path.join(carpeta_incremental, os.path.basename(destino) + '.estado.pkl')
+    instrumentacion = Instrumentacion(usar_tracemalloc=perfil == 'tracemalloc') if perfil else None
+    inicio = time.perf_counter()
+    try:
+        df_resultado = ejecutar(
+            par['zip'], par['csv'], destino, por_sucursal=por_sucursal, cache=cache,
+            estado_incremental=estado, instrumentacion=instrumentacion, formatos=formatos,
+            csv_chunksize=csv_chunksize
+        )
+    except Exception as e:
+        resumen.update(estado='error', error=f"{type(e).__name__}: {e}")
+    else:
+        resumen.update(
+            estado='ok',
+            archivos=list(rutas_de_salida(destino, formatos).values()),
+            filas=len(df_resultado),
+            por_estado={str(k): int(v) for k, v in df_resultado['ESTADO'].value_counts(sort=False).items()},
+        )
+        if 'sucursales_recalculadas' in df_resultado.attrs:
+            resumen['sucursales_recalculadas'] = df_resultado.attrs['sucursales_recalculadas']
+        if ruta_historial:
+            resumen['periodo'] = par.get('periodo') or periodo_por_defecto(df_resultado)
+            HistorialResultados(ruta_historial).agregar(
+                df_resultado, resumen['periodo'], fuente=os.path.basename(destino)
+            )
+    resumen['segundos'] = round(time.perf_counter() - inicio, 3)
+    if instrumentacion:
+        resumen.update(etapas=instrumentacion.resumen(), eventos=instrumentacion.eventos)
+    return resumen
+
+
+def procesar_lote(pares, carpeta_salida, workers=1, por_sucursal=False, cache=None, carpeta_incremental=None,
+                  ruta_historial=None, perfil=None, formatos=('xlsx',), csv_chunksize=None):
+    """
+    Procesa todos los pares (en paralelo si workers > 1) y devuelve la lista de
+    resúmenes en el mismo orden que los pares.
+    """
+    os.makedirs(carpeta_salida, exist_ok=True)
+    tarea = partial(
+        procesar_par, carpeta_salida=carpeta_salida, por_sucursal=por_sucursal, cache=cache,
+        carpeta_incremental=carpeta_incremental, ruta_historial=ruta_historial, perfil=perfil,
+        formatos=formatos, csv_chunksize=csv_chunksize
+    )
+    if workers <= 1:
+        return [tarea(par) for par in pares]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(tarea, pares))
@@ -0,0 +1,126 @@
+import html
+import importlib.util
+import os
+from datetime import datetime
+
+from controllers.file_controller import FORMATOS_ESTADO, export_excel_with_style
+from services.comparador import ESTADOS, resumen_por_estado
+
+def exportar_xlsx(df, destino, por_sucursal=False):
+    # export_excel_with_style lanza ValueError si alguna hoja supera MAX_FILAS_EXCEL
+    export_excel_with_style(df, destino, por_sucursal=por_sucursal)
+
+
+def exportar_csv(df, destino, por_sucursal=False):
+    # Un CSV no tiene hojas: por_sucursal no aplica y se ignora.
+    # Mismas convenciones que el CSV intersucursal; UTF-8 con BOM para que Excel lo abra bien
+    df.to_csv(destino, index=False, sep=';', decimal=',', encoding='utf-8-sig', date_format='%Y-%m-%d %H:%M:%S')
+
+
+def exportar_parquet(df, destino, por_sucursal=False):
+    # Un Parquet no tiene hojas: por_sucursal no aplica y se ignora
+    df.to_parquet(destino, index=False)
+
+
+def _celda_estado(estado, valor):
+    formato = FORMATOS_ESTADO.get(estado)
+    if formato is None or not valor:
+        return f'<td>{valor}</td>'
+    return f'<td style="background:{formato["bg_color"]};color:{formato["font_color"]}">{valor}</td>'
+
+
+def exportar_html(df, destino, por_sucursal=False):
+    """
+    Tablero HTML autocontenido (sin archivos ni scripts externos) con la cantidad de
+    productos por sucursal y ESTADO. Se arma con resumen_por_estado, no con las filas.
+    """
+    resumen = resumen_por_estado(df)
+    columnas = ['SUCURSAL', *ESTADOS, 'TOTAL']
+    filas = [
+        '<tr><td>' + html.escape(str(sucursal)) + '</td>'
+        + ''.join(_celda_estado(estado, int(fila[estado])) for estado in ESTADOS)
+        + f'<td><b>{int(fila["TOTAL"])}</b></td></tr>'
+        for sucursal, fila in resumen.iterrows()
+    ]
+    totales = resumen.sum()
+    filas.append(
+        '<tr class="total"><td>TOTAL</td>'
+        + ''.join(f'<td>{int(totales[estado])}</td>' for estado in ESTADOS)
+        + f'<td>{int(totales["TOTAL"])}</td></tr>'
+    )
+    contenido = f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Reporte de faltas por sucursal</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #999; padding: 4px 10px; text-align: right; }}
+th {{ background: #eee; }}
+td:first-child {{ text-align: left; }}
+tr.total td {{ font-weight: bold; background: #eee; }}
+</style>
+</head>
+<body>
+<h1>Reporte de faltas por sucursal</h1>
+<p>Generado el {datetime.now():%Y-%m-%d %H:%M}. {len(df)} productos en {len(resumen)} sucursales.</p>
+<table>
+<tr>{''.join(f'<th>{html.escape(c)}</th>' for c in columnas)}</tr>
+{chr(10).join(filas)}
+</table>
+</body>
+</html>
+"""
+    with open(destino, 'w', encoding='utf-8') as f:
+        f.write(contenido)
+
+
+# Formatos de salida: nombre -> (extensión, función exportar(df, destino, por_sucursal)).
+# por_sucursal solo cambia el xlsx (una hoja por SUCURSAL); el resto lo ignora, así se
+# puede pedir junto con otros formatos en la misma corrida.
+EXPORTADORES = {
+    'xlsx': ('.xlsx', exportar_xlsx),
+    'csv': ('.csv', exportar_csv),
+    'parquet': ('.parquet', exportar_parquet),
+    'html': ('.html', exportar_html),
+}
+
+
+def validar_formatos(formatos):
+    """
+    Verifica que se pueda exportar en todos los formatos pedidos, antes de procesar.
+    Lanza ValueError si alguno no existe o si falta la librería de Parquet.
+    """
+    desconocidos = [f for f in formatos if f not in EXPORTADORES]
+    if desconocidos or not formatos:
+        raise ValueError(f"Formatos de salida no válidos: {desconocidos or formatos}. "
+                         f"Opciones: {', '.join(EXPORTADORES)}")
+    if 'parquet' in formatos and not (importlib.util.find_spec('pyarrow') or importlib.util.find_spec('fastparquet')):
+        raise ValueError("Para exportar en Parquet hay que instalar pyarrow o fastparquet")
+
+
+def rutas_de_salida(destino, formatos):
+    """Ruta de cada formato: el destino con la extensión del formato. Retorna {formato: ruta}."""
+    base, _ = os.path.splitext(destino)
+    return {formato: base + EXPORTADORES[formato][0] for formato in formatos}
+
+
+def exportar(df, destino, formatos=('xlsx',), por_sucursal=False):
+    """
+    Escribe el mismo resultado en memoria en cada uno de los formatos pedidos.
+    Cada archivo se escribe primero como "<ruta>.tmp" y se renombra al terminar, así
+    nunca queda un reporte a medio escribir con el nombre final.
+    Retorna la lista de archivos generados, en el orden de formatos.
+    """
+    validar_formatos(formatos)
+    rutas = rutas_de_salida(destino, formatos)
+    for formato, ruta in rutas.items():
+        temporal = ruta + '.tmp'
+        try:
+            EXPORTADORES[formato][1](df, temporal, por_sucursal=por_sucursal)
+            os.replace(temporal, ruta)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+    return list(rutas.values())
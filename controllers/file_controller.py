@@ -1,33 +1,75 @@
+import importlib.util
 import os
 import re
 import zipfile
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-from services.comparador import roman_to_int
+import xlsxwriter
+from xlsxwriter.utility import xl_col_to_name
+from services.comparador import (
+    AGREGACION_LLEGADAS, ClavesInvalidasError, agrupar_llegadas, compartir_categorias, normalizar_claves
+)
+from services.sucursales import aplicar_alias, resolver_sucursales
+from services.parser_txt import COLUMNAS_TXT, parsear_txt_pedidos
+from services.cache import clave as clave_cache, hash_archivo
+from services.dialecto import decodificar_texto, detectar_dialecto_csv
+from services.instrumentacion import medir
 
-def parse_sucursal(destino_str: str) -> int:
-    """
-    Toma un string como 'S. ANTONIOLLI II' y devuelve un entero (2 en este caso).
-    Si no encuentra un número romano, retorna None (ajusta según prefieras).
-    """
-    pattern = re.compile(r'([IVXLCDM]+)$', re.IGNORECASE)
-    match = pattern.search(destino_str.strip())
-    if match:
-        roman_part = match.group(1)
-        return roman_to_int(roman_part)
-    return None
+# Nombre de cada TXT dentro del ZIP, ej. "Pedido Suc. 12 ... Fecha 20250301.txt"
+PATRON_NOMBRE_TXT = re.compile(r"Suc\. (\d+).*Fecha (\d{8})")
 
-def procesar_zip_a_dataframe(zip_path):
-    """
-    Procesa un archivo ZIP extrayendo sus archivos .txt y generando un único DataFrame
-    con la información de todos los archivos, incluyendo la sucursal extraída del nombre.
+# Columnas del DataFrame de pedidos que devuelve procesar_zip_a_dataframe
+COLUMNAS_PEDIDOS = [nombre for nombre, _, _ in COLUMNAS_TXT] + ['SUCURSAL', 'Fecha_Envio']
 
-    Retorna:
-        pd.DataFrame: DataFrame con todas las filas de todos los TXT.
-    """
-    # DataFrame vacío donde iremos concatenando
-    df_final = pd.DataFrame()
+# Nombres de las columnas del CSV intersucursal -> nombres uniformes
+COLUMNAS_CSV = {
+    'Operación': 'OPERACION',
+    'Número': 'NUMERO_ENVIO',
+    'Estado': 'ESTADO_LLEGADA',
+    'Origen': 'ORIGEN',
+    'Destino': 'SUCURSAL',
+    'Fecha Envio': 'FECHA_ENVIO',
+    'Fecha Recepcion': 'FECHA_RECEPCION',
+    'Operador Envio': 'OPERADOR_ENVIO',
+    'Operador Recepcion': 'OPERADOR_RECEPCION',
+    'Troquel': 'TROQUEL',
+    'Producto': 'DESCRIPCION_LLEGADA',
+    'Cantidad': 'CANTIDAD_ENVIADA',
+    'Unidades': 'UNIDADES_ENVIADAS',
+    'CantidadRecibida': 'CANTIDAD_RECIBIDA',
+    'UnidadesRecibidas': 'UNIDADES_RECIBIDAS',
+    'Importe': 'IMPORTE'
+}
+
+# Columnas del CSV que usa el reporte (las únicas que se leen) y su tipo en modo streaming
+DTYPES_CSV_REPORTE = {
+    'Número': 'Int64',
+    'Estado': 'category',
+    'Destino': 'category',
+    'Fecha Envio': str,
+    'Fecha Recepcion': str,
+    'Troquel': 'Int64',
+    'Producto': 'category',
+    'Cantidad': 'float64',
+}
 
+# En la lectura completa solo se fijan los tipos de las columnas de texto: los números
+# los infiere el motor de C, que es bastante más rápido que parsear a Int64.
+DTYPES_CSV_TEXTO = {columna: tipo for columna, tipo in DTYPES_CSV_REPORTE.items() if tipo in (str, 'category')}
+
+# En la lectura por bloques Troquel y Número se leen como texto: un valor no numérico
+# lo informa normalizar_claves (o queda como texto), igual que en la lectura completa,
+# en lugar de cortar read_csv con un error sin la fila.
+DTYPES_CSV_BLOQUES = {**DTYPES_CSV_REPORTE, 'Troquel': str, 'Número': str}
+
+def _iterar_txt_extraidos(zip_path):
+    """
+    Extrae el ZIP completo a un directorio temporal y devuelve (nombre, texto)
+    por cada archivo .txt. Requiere espacio libre igual al tamaño descomprimido.
+    """
     with tempfile.TemporaryDirectory() as extract_path:
         # Descomprimir el ZIP
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
@@ -37,97 +79,206 @@ def procesar_zip_a_dataframe(zip_path):
         for filename in os.listdir(extract_path):
             if filename.endswith('.txt'):
                 filepath = os.path.join(extract_path, filename)
+                # El encoding (UTF-8, con o sin BOM, o latin-1) se detecta en cada archivo
+                with open(filepath, 'rb') as file:
+                    yield filename, decodificar_texto(file.read())
 
-                # Extraer sucursal y fecha del nombre del archivo
-                match = re.search(r"Suc\. (\d+).*Fecha (\d{8})", filename)
-                if not match:
-                    raise ValueError(f"No se pudo extraer sucursal/fecha del nombre: {filename}")
-
-                sucursal = match.group(1)
-                raw_fecha = match.group(2)
-
-                # Ajustar sucursal si es 32, 33, 34
-                if sucursal == '32':
-                    sucursal = '26'
-                elif sucursal == '34':
-                    sucursal = '27'
-                elif sucursal == '33':
-                    sucursal = '28'
-
-                # Formato de fecha YYYY/MM/DD (si necesitas usarla)
-                fecha_envio = f"{raw_fecha[:4]}/{raw_fecha[4:6]}/{raw_fecha[6:8]}"
-
-                # Leer el contenido del archivo TXT
-                # Ajusta encoding si tus archivos no son utf-8
-                with open(filepath, 'r', encoding='utf-8') as file:
-                    lines = file.readlines()
-
-                # Procesar líneas (slicing fijo)
-                data = []
-                for line in lines:
-                    codebar = line[:13].strip()
-                    troquel = line[13:20].strip()
-                    descripcion = line[20:50].strip()
-                    cantidad = line[50:].strip()
-                    data.append([codebar, troquel, descripcion, cantidad])
-
-                # Crear DataFrame para este archivo
-                df_temp = pd.DataFrame(data, columns=[
-                    'Codebar', 'Troquel', 'Descripción', 'Cantidad'
-                ])
-                # Añadir sucursal y fecha
-                df_temp['Sucursal'] = sucursal
-                df_temp['Fecha_Envio'] = fecha_envio
-
-                # Renombrar columnas a las definitivas que usarás para el merge
-                df_temp.rename(columns={
-                    'Codebar': 'CODBARRA',
-                    'Troquel': 'TROQUEL',
-                    'Descripción': 'DESCRIPCION',
-                    'Cantidad': 'CANTIDAD_PEDIDA',
-                    'Sucursal': 'SUCURSAL'
-                }, inplace=True)
-
-                # Concatenar al df_final
-                df_final = pd.concat([df_final, df_temp], ignore_index=True)
 
-    return df_final
+def _miembros_txt(zip_ref):
+    """Miembros .txt del ZIP (se excluyen directorios y otros tipos de archivo)."""
+    return [
+        info for info in zip_ref.infolist()
+        if not info.is_dir() and info.filename.endswith('.txt')
+    ]
+
+
+def _leer_miembro(zip_ref, info):
+    """Lee un miembro del ZIP como texto, en memoria, detectando su encoding."""
+    with zip_ref.open(info) as raw:
+        return decodificar_texto(raw.read())
 
 
-def leer_csv_desde_fila_11(ruta_csv):
+def _clave_miembro(info):
+    """Clave de cache de un miembro: su nombre, CRC y tamaño (sin descomprimirlo)."""
+    return clave_cache('txt', info.filename, info.CRC, info.file_size)
+
+
+def _parsear_en_memoria(zip_path, cache=None, instrumentacion=None):
     """
-    Lee un CSV donde la tabla principal empieza en la fila 11 (cabecera incluida).
-    Retorna un DataFrame con las columnas renombradas y la sucursal convertida a entero.
+    Lee y parsea cada miembro .txt directamente desde el ZIP como stream, sin escribir
+    a disco. Los miembros que no son .txt (o directorios) se saltean sin descomprimirlos,
+    y los que ya están en el cache no se vuelven a leer.
+    Genera (nombre, DataFrame).
     """
-    # Ajusta sep, decimal, encoding según tu archivo
-    df = pd.read_csv(
-        ruta_csv,
-        skiprows=10,      # Omitir las primeras 10 filas
-        sep=';',          # Si tu archivo está separado por ';'
-        decimal=',',      # Si tus números usan coma como decimal
-        encoding='latin-1'
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for info in _miembros_txt(zip_ref):
+            df = cache.obtener(_clave_miembro(info)) if cache else None
+            if df is None:
+                with medir(instrumentacion, 'Descomprimir TXT'):
+                    texto = _leer_miembro(zip_ref, info)
+                with medir(instrumentacion, 'Parsear TXT') as registro:
+                    df = parsear_txt_pedidos(texto)
+                    registro['filas_salida'] = len(df)
+                if cache:
+                    cache.guardar(_clave_miembro(info), df)
+            yield os.path.basename(info.filename), df
+
+
+def _parsear_miembro(zip_path, nombre_miembro):
+    """
+    Tarea de un worker: abre su propio handle del ZIP y parsea un único miembro.
+    Es una función de módulo para que pueda enviarse a un ProcessPoolExecutor.
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        return parsear_txt_pedidos(_leer_miembro(zip_ref, zip_ref.getinfo(nombre_miembro)))
+
+
+def _parsear_en_paralelo(zip_path, workers, usar_procesos, cache=None):
+    """
+    Reparte los miembros .txt del ZIP que no están en el cache entre un pool de workers.
+    Genera (nombre, DataFrame) en el mismo orden que el recorrido secuencial.
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        miembros = _miembros_txt(zip_ref)
+
+    # Validar todos los nombres antes de repartir trabajo
+    for info in miembros:
+        _sucursal_y_fecha(os.path.basename(info.filename))
+
+    cacheados = {info.filename: cache.obtener(_clave_miembro(info)) for info in miembros} if cache else {}
+    pendientes = [info.filename for info in miembros if cacheados.get(info.filename) is None]
+
+    pool = ProcessPoolExecutor if usar_procesos else ThreadPoolExecutor
+    with pool(max_workers=workers) as executor:
+        resultados = executor.map(_parsear_miembro, [zip_path] * len(pendientes), pendientes)
+        for info in miembros:
+            df = cacheados.get(info.filename)
+            if df is None:
+                df = next(resultados)
+                if cache:
+                    cache.guardar(_clave_miembro(info), df)
+            yield os.path.basename(info.filename), df
+
+
+def _miembros_a_procesar(zip_path, en_memoria):
+    """TXT que se van a procesar, en orden (solo lee el índice del ZIP)."""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        miembros = _miembros_txt(zip_ref)
+    if not en_memoria:
+        # Al extraer a disco solo se recorren los TXT de la raíz del ZIP
+        miembros = [info for info in miembros if '/' not in info.filename]
+    return miembros
+
+
+def crc_por_sucursal(zip_path, en_memoria=True):
+    """
+    Huella de los TXT de cada sucursal armada con el nombre, CRC y tamaño de sus
+    miembros (solo lee el índice del ZIP). Retorna {sucursal: hash hexadecimal}.
+    Sirve como huellas_pedidos de comparar_incremental sin hashear las filas.
+    """
+    por_sucursal = {}
+    for info in _miembros_a_procesar(zip_path, en_memoria):
+        sucursal, _ = _sucursal_y_fecha(os.path.basename(info.filename))
+        sucursal = int(aplicar_alias([sucursal])[0])
+        por_sucursal.setdefault(sucursal, []).append((info.filename, info.CRC, info.file_size))
+    return {sucursal: clave_cache('txt', *firmas) for sucursal, firmas in por_sucursal.items()}
+
+
+def _sucursal_y_fecha(filename):
+    """Extrae (sucursal, fecha YYYYMMDD) del nombre de un TXT de pedidos."""
+    match = PATRON_NOMBRE_TXT.search(filename)
+    if not match:
+        raise ValueError(f"No se pudo extraer sucursal/fecha del nombre: {filename}")
+    return int(match.group(1)), match.group(2)
+
+
+def procesar_zip_a_dataframe(zip_path, en_memoria=True, workers=None, usar_procesos=True, progreso=None,
+                             cache=None, instrumentacion=None):
+    """
+    Procesa un archivo ZIP leyendo sus archivos .txt y generando un único DataFrame
+    con la información de todos los archivos, incluyendo la sucursal extraída del nombre.
+
+    Parámetros:
+        zip_path: ruta al archivo ZIP.
+        en_memoria: si es True (por defecto) cada .txt se lee como stream desde el ZIP,
+            sin directorio temporal. Si es False se extrae todo el ZIP a disco primero.
+        workers: cantidad de workers para parsear los miembros en paralelo.
+            None o 1 (por defecto) procesa los archivos de a uno. Solo en modo en_memoria.
+        usar_procesos: con workers > 1, usa un pool de procesos (True) o de threads (False).
+        progreso: función opcional progreso(procesados, total) que se llama después
+            de parsear cada TXT.
+        cache: CacheParseo opcional. Cada TXT parseado se guarda con una clave armada
+            con su nombre, CRC y tamaño dentro del ZIP, y en las siguientes corridas se
+            carga del cache sin descomprimirlo. Solo en modo en_memoria.
+        instrumentacion: Instrumentacion opcional; en modo en_memoria secuencial registra
+            por separado la descompresión y el parseo de cada TXT, y en todos los modos
+            el armado del DataFrame final.
+
+    Retorna:
+        pd.DataFrame: DataFrame con todas las filas de todos los TXT.
+    """
+    if workers is not None and workers > 1:
+        if not en_memoria:
+            raise ValueError("El modo paralelo solo está disponible con en_memoria=True")
+        resultados = _parsear_en_paralelo(zip_path, workers, usar_procesos, cache)
+    elif en_memoria:
+        resultados = _parsear_en_memoria(zip_path, cache, instrumentacion)
+    else:
+        # Parsear cada archivo de una vez (ancho fijo, columnas tipadas)
+        resultados = (
+            (filename, parsear_txt_pedidos(texto)) for filename, texto in _iterar_txt_extraidos(zip_path)
+        )
+
+    total = len(_miembros_a_procesar(zip_path, en_memoria)) if progreso else None
+
+    # Se juntan los resultados de cada archivo y el DataFrame final se arma una sola vez
+    partes, sucursales, fechas = [], [], []
+    for filename, df_temp in resultados:
+        # Extraer sucursal y fecha del nombre del archivo
+        sucursal, fecha = _sucursal_y_fecha(filename)
+        partes.append(df_temp)
+        sucursales.append(sucursal)
+        fechas.append(fecha)
+        if progreso:
+            progreso(len(partes), total)
+
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS_PEDIDOS)
+
+    with medir(instrumentacion, 'Armar DataFrame de pedidos') as registro:
+        df_final = _armar_pedidos(partes, sucursales, fechas)
+        registro['filas_salida'] = len(df_final)
+    return df_final
+
+
+def _armar_pedidos(partes, sucursales, fechas):
+    """Une los DataFrames de cada TXT y agrega SUCURSAL y Fecha_Envio de cada fila."""
+    # DESCRIPCION queda categórica, con un único diccionario para todos los TXT
+    df_final = pd.concat(compartir_categorias(partes, 'DESCRIPCION'), ignore_index=True)
+    filas_por_archivo = [len(parte) for parte in partes]
+
+    # Sucursal de cada fila, ajustando 32, 33, 34 con la tabla de alias compartida
+    df_final['SUCURSAL'] = np.repeat(aplicar_alias(sucursales), filas_por_archivo)
+    normalizar_claves(df_final, 'ZIP de pedidos')
+
+    # Fecha de envío YYYY/MM/DD: se formatean solo las fechas distintas (categorías)
+    fechas_unicas, codigos = np.unique(fechas, return_inverse=True)
+    df_final['Fecha_Envio'] = pd.Categorical.from_codes(
+        np.repeat(codigos, filas_por_archivo),
+        categories=[f"{f[:4]}/{f[4:6]}/{f[6:8]}" for f in fechas_unicas]
     )
 
+    return df_final
+
+
+def _normalizar_csv(df):
+    """
+    Renombra las columnas del CSV intersucursal, parsea las fechas y convierte
+    la sucursal (ej. "S. ANTONIOLLI II") a entero. Modifica df en el lugar.
+    """
     # Renombrar columnas a algo uniforme
     # Ajusta según las columnas reales de tu CSV
-    df.rename(columns={
-        'Operación': 'OPERACION',
-        'Número': 'NUMERO_ENVIO',
-        'Estado': 'ESTADO_LLEGADA',
-        'Origen': 'ORIGEN',
-        'Destino': 'SUCURSAL',
-        'Fecha Envio': 'FECHA_ENVIO',
-        'Fecha Recepcion': 'FECHA_RECEPCION',
-        'Operador Envio': 'OPERADOR_ENVIO',
-        'Operador Recepcion': 'OPERADOR_RECEPCION',
-        'Troquel': 'TROQUEL',
-        'Producto': 'DESCRIPCION_LLEGADA',
-        'Cantidad': 'CANTIDAD_ENVIADA',
-        'Unidades': 'UNIDADES_ENVIADAS',
-        'CantidadRecibida': 'CANTIDAD_RECIBIDA',
-        'UnidadesRecibidas': 'UNIDADES_RECIBIDAS',
-        'Importe': 'IMPORTE'
-    }, inplace=True)
+    df.rename(columns=COLUMNAS_CSV, inplace=True)
 
     # Parsear fechas (si las columnas existen)
     if 'FECHA_ENVIO' in df.columns:
@@ -137,11 +288,90 @@ def leer_csv_desde_fila_11(ruta_csv):
 
     # Convertir la sucursal (ej. "S. ANTONIOLLI II") a entero
     # Ajusta la lógica si tu texto difiere
-    df['SUCURSAL'] = df['SUCURSAL'].astype(str).apply(parse_sucursal)
-
+    destinos = df['SUCURSAL']
+    df['SUCURSAL'] = resolver_sucursales(destinos)
+    sin_sucursal = df['SUCURSAL'].isna()
+    if sin_sucursal.any():
+        raise ClavesInvalidasError(
+            "CSV intersucursal: no se pudo obtener la sucursal de los destinos: "
+            + ', '.join(repr(str(d)) for d in destinos[sin_sucursal].unique()[:5])
+        )
+    normalizar_claves(df, 'CSV intersucursal')
     return df
 
 
+@lru_cache(maxsize=None)
+def _motor_csv():
+    """Motor de pd.read_csv más rápido disponible: pyarrow si está instalado, si no el de C."""
+    return 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+
+
+def leer_csv_desde_fila_11(ruta_csv, chunksize=None, cache=None):
+    """
+    Lee el CSV intersucursal, cuya tabla principal suele empezar en la fila 11 (cabecera
+    incluida). El encoding, la línea de cabecera y el separador se detectan con los
+    primeros KB del archivo (detectar_dialecto_csv), así un preámbulo de otro largo o
+    un export en UTF-8 se leen igual, y un archivo sin las columnas esperadas falla
+    antes de leerlo entero. Solo se leen las columnas que usa el reporte
+    (DTYPES_CSV_REPORTE), con tipos explícitos y el motor más rápido disponible.
+    Retorna un DataFrame con las columnas renombradas y la sucursal convertida a entero.
+
+    Con chunksize se lee en modo streaming (siempre con el motor de C), de a
+    chunksize filas, y cada bloque se agrupa por
+    SUCURSAL/TROQUEL y se acumula con agrupar_llegadas. En ese caso se retorna
+    directamente el DataFrame agrupado, listo para comparar_dataframes, y la memoria
+    depende de la cantidad de pares (SUCURSAL, TROQUEL) y no del tamaño del archivo.
+
+    Con cache (un CacheParseo) el resultado se guarda con una clave armada con el hash
+    del contenido del CSV, y si el mismo archivo se vuelve a leer se carga del cache.
+    """
+    if cache is not None:
+        clave = clave_cache('csv', hash_archivo(ruta_csv), chunksize is not None)
+        df = cache.obtener(clave)
+        if df is None:
+            df = leer_csv_desde_fila_11(ruta_csv, chunksize=chunksize)
+            cache.guardar(clave, df)
+        return df
+
+    dialecto = detectar_dialecto_csv(ruta_csv, list(DTYPES_CSV_REPORTE))
+    opciones = dict(
+        skiprows=dialecto.fila_cabecera,  # Preámbulo antes de la cabecera
+        sep=dialecto.separador,
+        decimal=dialecto.decimal,
+        encoding=dialecto.encoding,
+        usecols=list(DTYPES_CSV_REPORTE),
+    )
+
+    if chunksize is None:
+        motor = _motor_csv()
+        try:
+            df = pd.read_csv(ruta_csv, engine=motor, dtype=DTYPES_CSV_TEXTO, **opciones)
+        except (ValueError, TypeError):
+            # Alguna versión de pyarrow no soporta una opción o un dtype: se usa el de C
+            if motor == 'c':
+                raise
+            df = pd.read_csv(ruta_csv, engine='c', dtype=DTYPES_CSV_TEXTO, **opciones)
+        return _normalizar_csv(df)
+
+    # Los bloques necesitan tipos fijos para que todos salgan iguales
+    acumulado = None
+    with pd.read_csv(ruta_csv, chunksize=chunksize, dtype=DTYPES_CSV_BLOQUES, **opciones) as lector:
+        for chunk in lector:
+            parcial = agrupar_llegadas(_normalizar_csv(chunk))
+            if acumulado is not None:
+                partes = compartir_categorias([acumulado, parcial], 'DESCRIPCION_LLEGADA')
+                parcial = agrupar_llegadas(pd.concat(partes, ignore_index=True))
+            acumulado = parcial
+
+    if acumulado is None:
+        return pd.DataFrame(columns=['SUCURSAL', 'TROQUEL', *AGREGACION_LLEGADAS])
+    # Número pasa a entero si todos los valores son numéricos, como al inferirlo
+    numeros = pd.to_numeric(acumulado['NUMERO_ENVIO'], errors='coerce')
+    if numeros.notna().sum() == acumulado['NUMERO_ENVIO'].notna().sum():
+        acumulado['NUMERO_ENVIO'] = numeros.astype('Int64')
+    return acumulado
+
+
 def leer_llegadas_csv(ruta_csv):
     """
     Lee el CSV de la primera tabla (lo que llegó).
@@ -172,65 +402,141 @@ def leer_llegadas_csv(ruta_csv):
 
     return df
 
-def export_excel_with_style(df, output_path):
-    writer = pd.ExcelWriter(output_path, engine='xlsxwriter')
-    df.to_excel(writer, index=False, sheet_name='Reporte')
-    workbook  = writer.book
-    worksheet = writer.sheets['Reporte']
-    
+# Colores de cada ESTADO en el reporte (colores claros)
+FORMATOS_ESTADO = {
+    'COMPLETO':   {'bg_color': '#C6EFCE', 'font_color': '#006100'},
+    'INCOMPLETO': {'bg_color': '#FFEB9C', 'font_color': '#9C5700'},
+    'ERRONEO':    {'bg_color': '#FFC7CE', 'font_color': '#9C0006'},
+    'NO PEDIDO':  {'bg_color': '#FFC7CE', 'font_color': '#9C0006'},
+    'NO ENVIADO': {'bg_color': '#FFC7CE', 'font_color': '#9C0006'},
+}
+
+# Ancho máximo de columna del reporte y filas que se miden cuando hay que pasar a str
+ANCHO_MAXIMO_COLUMNA = 60
+MUESTRA_ANCHO = 10_000
+
+# Última fila de datos que entra en una hoja de Excel (la primera es la cabecera)
+MAX_FILAS_EXCEL = 1_048_575
+
+# Filas que se convierten a objetos de Python a la vez al escribir una hoja
+BLOQUE_FILAS_EXCEL = 10_000
+
+
+def _valores_columna(serie):
+    """Valores de la columna como objetos de Python, con None en lugar de NaN/NaT/NA."""
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def ancho_columna(serie, ancho_maximo=ANCHO_MAXIMO_COLUMNA, muestra=MUESTRA_ANCHO):
+    """
+    Ancho de columna para el Excel: el texto más largo (o el título) + 2, hasta ancho_maximo.
+    No convierte la columna entera a str:
+      - fechas: ancho fijo del formato de fecha del reporte;
+      - enteros: dígitos del mínimo y del máximo;
+      - categóricas: largo de las categorías;
+      - texto: largo vectorizado (str.len); si hay objetos que no son str se mide
+        una muestra de `muestra` filas convertida a str.
+    """
+    valores = serie.dropna()
+    if valores.empty:
+        contenido = 0
+    elif pd.api.types.is_datetime64_any_dtype(valores):
+        contenido = len('yyyy-mm-dd hh:mm:ss')
+    elif pd.api.types.is_bool_dtype(valores):
+        contenido = len('False')
+    elif pd.api.types.is_integer_dtype(valores):
+        contenido = max(len(str(valores.min())), len(str(valores.max())))
+    elif isinstance(valores.dtype, pd.CategoricalDtype):
+        contenido = int(valores.cat.categories.astype(str).str.len().max())
+    else:
+        largos = valores.str.len() if valores.dtype == object else None
+        if largos is None or largos.isna().any():
+            if len(valores) > muestra:
+                valores = valores.sample(n=muestra, random_state=0)
+            largos = valores.astype(str).str.len()
+        contenido = int(largos.max())
+    return min(max(contenido, len(str(serie.name))) + 2, ancho_maximo)
+
+
+def _escribir_hoja(workbook, nombre_hoja, df, formatos, ancho_maximo=ANCHO_MAXIMO_COLUMNA):
+    """
+    Escribe df en una hoja nueva, fila por fila (requisito del modo constant_memory),
+    con anchos de columna y el formato condicional por ESTADO. Los valores se
+    convierten de a BLOQUE_FILAS_EXCEL filas, así la memoria no crece con el reporte.
+
+    Lanza ValueError si df no entra en una hoja: en modo constant_memory xlsxwriter
+    descarta sin avisar las filas que pasan del límite.
+    """
+    if len(df) > MAX_FILAS_EXCEL:
+        alternativas = "Exportá en CSV o Parquet"
+        if not nombre_hoja.startswith('Suc. '):  # la hoja única se puede separar por sucursal
+            alternativas += ", o con una hoja por sucursal"
+        raise ValueError(
+            f"La hoja '{nombre_hoja}' tendría {len(df)} filas y una hoja de Excel admite {MAX_FILAS_EXCEL}. "
+            f"{alternativas}."
+        )
+    worksheet = workbook.add_worksheet(nombre_hoja)
+
     # Autoajuste de columnas basado en el contenido
     for i, col in enumerate(df.columns):
-        column_len = max(df[col].astype(str).map(len).max(), len(col)) + 2
-        worksheet.set_column(i, i, column_len)
-        
+        worksheet.set_column(i, i, ancho_columna(df[col], ancho_maximo=ancho_maximo))
+
+    worksheet.write_row(0, 0, list(df.columns), formatos['header'])
+    for inicio in range(0, len(df), BLOQUE_FILAS_EXCEL):
+        bloque = df.iloc[inicio:inicio + BLOQUE_FILAS_EXCEL]
+        columnas = [_valores_columna(bloque[col]) for col in bloque.columns]
+        for fila, valores in enumerate(zip(*columnas), start=inicio + 1):
+            worksheet.write_row(fila, 0, valores)
+
     last_row = len(df) + 1  # considerando que la fila 1 es el header
+    col_estado = xl_col_to_name(df.columns.get_loc('ESTADO'))
+    col_pedida = xl_col_to_name(df.columns.get_loc('CANTIDAD PEDIDA'))
+    col_enviada = xl_col_to_name(df.columns.get_loc('CANTIDAD ENVIADA'))
 
-    # Definir formatos para cada estado (colores claros)
-    complete_format   = workbook.add_format({'bg_color': '#C6EFCE', 'font_color': '#006100'})
-    incomplete_format = workbook.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C5700'})
-    error_format      = workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
-    
-    # Formato para marcar la celda de "CANTIDAD ENVIADA" con borde
-    border_format = workbook.add_format({'border': 2})
-    
-    # Aplicar formato condicional a las filas completas (asumiendo que la columna ESTADO es la K)
-    worksheet.conditional_format(f'A2:K{last_row}', {
-        'type': 'formula',
-        'criteria': '=$K2="COMPLETO"',
-        'format': complete_format
-    })
-    worksheet.conditional_format(f'A2:K{last_row}', {
-        'type': 'formula',
-        'criteria': '=$K2="INCOMPLETO"',
-        'format': incomplete_format
-    })
-    worksheet.conditional_format(f'A2:K{last_row}', {
-        'type': 'formula',
-        'criteria': '=$K2="ERRONEO"',
-        'format': error_format
-    })
-    worksheet.conditional_format(f'A2:K{last_row}', {
-        'type': 'formula',
-        'criteria': '=$K2="NO PEDIDO"',
-        'format': error_format
-    })
-    worksheet.conditional_format(f'A2:K{last_row}', {
+    # Aplicar formato condicional a las filas completas según la columna ESTADO
+    for estado in FORMATOS_ESTADO:
+        worksheet.conditional_format(f'A2:{col_estado}{last_row}', {
+            'type': 'formula',
+            'criteria': f'=${col_estado}2="{estado}"',
+            'format': formatos[estado]
+        })
+
+    # Marcar con borde la celda de "CANTIDAD ENVIADA" o "CANTIDAD PEDIDA" según el caso
+    worksheet.conditional_format(f'{col_enviada}2:{col_enviada}{last_row}', {
         'type': 'formula',
-        'criteria': '=$K2="NO ENVIADO"',
-        'format': error_format
+        'criteria': f'=OR(${col_estado}2="INCOMPLETO", ${col_estado}2="ERRONEO")',
+        'format': formatos['borde']
     })
-    
-    worksheet.conditional_format(f'F2:F{last_row}', {
+    worksheet.conditional_format(f'{col_pedida}2:{col_pedida}{last_row}', {
         'type': 'formula',
-        'criteria': '=OR($K2="INCOMPLETO", $K2="ERRONEO")',
-        'format': border_format
+        'criteria': f'=${col_estado}2="NO PEDIDO"',
+        'format': formatos['borde']
     })
 
-    worksheet.conditional_format(f'E2:E{last_row}', {
-        'type': 'formula',
-        'criteria': '=$K2="NO PEDIDO"',
-        'format': border_format
+
+def export_excel_with_style(df, output_path, por_sucursal=False, ancho_maximo=ANCHO_MAXIMO_COLUMNA):
+    """
+    Escribe el reporte con estilos en una sola pasada, usando el modo constant_memory
+    de xlsxwriter: cada fila se vuelca a disco apenas se escribe, así la memoria se
+    mantiene estable aunque el reporte tenga cientos de miles de filas.
+
+    Con por_sucursal=True se genera una hoja por SUCURSAL ("Suc. N") en lugar de
+    una única hoja "Reporte". ancho_maximo limita el ancho de las columnas.
+    """
+    workbook = xlsxwriter.Workbook(output_path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
     })
-    
-    writer.close()
+    formatos = {estado: workbook.add_format(fmt) for estado, fmt in FORMATOS_ESTADO.items()}
+    formatos['header'] = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    # Formato para marcar la celda de "CANTIDAD ENVIADA" con borde
+    formatos['borde'] = workbook.add_format({'border': 2})
 
+    try:
+        if por_sucursal:
+            for sucursal, df_sucursal in df.groupby('SUCURSAL', sort=True):
+                _escribir_hoja(workbook, f'Suc. {sucursal}', df_sucursal, formatos, ancho_maximo)
+        else:
+            _escribir_hoja(workbook, 'Reporte', df, formatos, ancho_maximo)
+    finally:
+        workbook.close()
@@ -1,8 +1,87 @@
+from services.cache import hash_archivo
 from services.comparador import comparar_dataframes
-from controllers.file_controller import export_excel_with_style
+from services.incremental import comparar_incremental
+from services.instrumentacion import medir
+from controllers.export_controller import exportar, validar_formatos
+from controllers.file_controller import (
+    crc_por_sucursal, export_excel_with_style, leer_csv_desde_fila_11, procesar_zip_a_dataframe
+)
 
-def procesar(df_pedidos, df_llegadas, destino):
+# Etapas del proceso completo, en orden
+ETAPA_ZIP = 'Leyendo ZIP de pedidos'
+ETAPA_CSV = 'Leyendo CSV intersucursal'
+ETAPA_COMPARAR = 'Comparando'
+ETAPA_EXPORTAR = 'Exportando reporte'
+ETAPAS = [ETAPA_ZIP, ETAPA_CSV, ETAPA_COMPARAR, ETAPA_EXPORTAR]
+
+
+class ProcesoCancelado(Exception):
+    """El usuario canceló el proceso entre dos etapas."""
+
+
+def procesar(df_pedidos, df_llegadas, destino, por_sucursal=False):
     df_resultado = comparar_dataframes(df_pedidos, df_llegadas)
-    # Se guarda el resultado en el destino seleccionado
-    df_resultado.to_excel(destino, index=False)
-    return export_excel_with_style(df_resultado, destino)
+    # Se guarda el resultado con estilos en el destino seleccionado (una sola escritura)
+    return export_excel_with_style(df_resultado, destino, por_sucursal=por_sucursal)
+
+
+def ejecutar(zip_path, csv_path, destino, por_sucursal=False, progreso=None, cancelado=None, cache=None,
+             estado_incremental=None, instrumentacion=None, formatos=('xlsx',), csv_chunksize=None):
+    """
+    Corre el proceso completo: ZIP -> CSV -> comparación -> reporte.
+
+    Parámetros:
+        progreso: función opcional progreso(etapa, actual, total). Se llama al empezar
+            cada etapa con (etapa, índice, len(ETAPAS)) y, durante la lectura del ZIP,
+            por cada TXT con (ETAPA_ZIP, procesados, total_txt).
+        cancelado: función opcional sin argumentos; si devuelve True al terminar una
+            etapa se lanza ProcesoCancelado y no se escribe el reporte.
+        cache: CacheParseo opcional para no volver a parsear un ZIP o CSV ya leído.
+        estado_incremental: ruta opcional del estado de la corrida anterior; si se indica
+            solo se recalculan las sucursales cuyos datos cambiaron (ver comparar_incremental).
+            Las sucursales recalculadas quedan en df_resultado.attrs['sucursales_recalculadas'].
+        instrumentacion: Instrumentacion opcional donde se registra el tiempo, las filas
+            y la memoria de cada etapa. Sin ella no se mide nada.
+        formatos: formatos del reporte (ver export_controller.EXPORTADORES). Cada uno se
+            escribe junto a destino con su extensión, todos desde el mismo resultado.
+            Se validan antes de empezar, así un formato no disponible falla enseguida.
+        csv_chunksize: si se indica, el CSV se lee en bloques de esa cantidad de filas
+            (ver leer_csv_desde_fila_11), para archivos que no entran en memoria.
+    """
+    validar_formatos(formatos)
+
+    def empezar(etapa):
+        if cancelado and cancelado():
+            raise ProcesoCancelado()
+        if progreso:
+            progreso(etapa, ETAPAS.index(etapa), len(ETAPAS))
+
+    empezar(ETAPA_ZIP)
+    progreso_zip = (lambda actual, total: progreso(ETAPA_ZIP, actual, total)) if progreso else None
+    with medir(instrumentacion, ETAPA_ZIP) as registro:
+        df_pedidos = procesar_zip_a_dataframe(
+            zip_path, progreso=progreso_zip, cache=cache, instrumentacion=instrumentacion
+        )
+        registro['filas_salida'] = len(df_pedidos)
+
+    empezar(ETAPA_CSV)
+    with medir(instrumentacion, ETAPA_CSV) as registro:
+        df_llegadas = leer_csv_desde_fila_11(csv_path, chunksize=csv_chunksize, cache=cache)
+        registro['filas_salida'] = len(df_llegadas)
+
+    empezar(ETAPA_COMPARAR)
+    with medir(instrumentacion, ETAPA_COMPARAR, len(df_pedidos) + len(df_llegadas)) as registro:
+        if estado_incremental:
+            df_resultado, recalculadas = comparar_incremental(
+                df_pedidos, df_llegadas, estado_incremental, huellas_pedidos=crc_por_sucursal(zip_path),
+                huella_llegadas=hash_archivo(csv_path)
+            )
+            df_resultado.attrs['sucursales_recalculadas'] = recalculadas
+        else:
+            df_resultado = comparar_dataframes(df_pedidos, df_llegadas)
+        registro['filas_salida'] = len(df_resultado)
+
+    empezar(ETAPA_EXPORTAR)
+    with medir(instrumentacion, ETAPA_EXPORTAR, len(df_resultado)):
+        exportar(df_resultado, destino, formatos, por_sucursal=por_sucursal)
+    return df_resultado
@@ -0,0 +1,252 @@
+import json
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
+
+from controllers.batch_controller import procesar_par
+from controllers.file_controller import PATRON_NOMBRE_TXT
+
+# Fecha del archivo en su nombre: "... Fecha 20250301 ..." o, si no, una fecha suelta
+# como 20250301 o 2025-03-01
+PATRON_FECHA = re.compile(r"Fecha[ _-]?(\d{8})")
+PATRON_FECHA_SUELTA = re.compile(r"(?<!\d)(\d{4})-?(\d{2})-?(\d{2})(?!\d)")
+
+NOMBRE_DIARIO = 'diario.jsonl'
+
+
+def fecha_del_nombre(nombre):
+    """Fecha YYYYMMDD que figura en el nombre del archivo, o None."""
+    match = PATRON_FECHA.search(nombre)
+    if match:
+        return match.group(1)
+    match = PATRON_FECHA_SUELTA.search(nombre)
+    return ''.join(match.groups()) if match else None
+
+
+def fecha_del_zip(ruta_zip):
+    """
+    Fecha de un ZIP de pedidos: la de su nombre o, si no tiene, la más reciente de los
+    TXT "Suc. N ... Fecha YYYYMMDD" que contiene (solo se lee el índice del ZIP).
+    """
+    fecha = fecha_del_nombre(os.path.basename(ruta_zip))
+    if fecha:
+        return fecha
+    with zipfile.ZipFile(ruta_zip) as zip_ref:
+        fechas = [m.group(2) for m in map(PATRON_NOMBRE_TXT.search, zip_ref.namelist()) if m]
+    return max(fechas) if fechas else None
+
+
+def _firma(ruta):
+    """Tamaño y fecha de modificación del archivo: si cambia alguno, cambió el archivo."""
+    info = os.stat(ruta)
+    return [info.st_size, info.st_mtime_ns]
+
+
+class VigilanteCarpeta:
+    """
+    Vigila una carpeta donde llegan ZIPs de pedidos y CSVs intersucursal, y procesa cada
+    ZIP con el CSV de la misma fecha (ver fecha_del_zip / fecha_del_nombre) apenas
+    están los dos completos.
+
+      - Un archivo se considera completo cuando su tamaño y fecha de modificación no
+        cambian durante `espera` segundos (y, si es un ZIP, cuando ya se puede abrir).
+      - Los pares listos se reparten en un pool de `workers` procesos; nunca hay más
+        trabajos en curso que workers.
+      - Cada inicio y fin de trabajo se anota en un diario JSON-lines en la carpeta de
+        salida. Al reiniciar, los pares que ya terminaron con los mismos archivos no se
+        vuelven a procesar; si un ZIP o su CSV cambian, el par se procesa de nuevo.
+
+    Los parámetros de procesar_par (formatos, por_sucursal, cache, historial, etc.) se
+    pasan en opciones_par.
+    """
+
+    def __init__(self, carpeta, carpeta_salida, workers=1, espera=30, avisar=print, **opciones_par):
+        if os.path.abspath(carpeta) == os.path.abspath(carpeta_salida):
+            # Los reportes CSV se confundirían con exportaciones nuevas
+            raise ValueError("La carpeta de salida tiene que ser distinta de la carpeta vigilada")
+        self.carpeta = carpeta
+        self.carpeta_salida = carpeta_salida
+        self.workers = max(1, workers)
+        self.espera = espera
+        self.avisar = avisar
+        self.tarea = partial(procesar_par, carpeta_salida=carpeta_salida, **opciones_par)
+        self.ruta_diario = os.path.join(carpeta_salida, NOMBRE_DIARIO)
+        os.makedirs(carpeta_salida, exist_ok=True)
+        # ruta -> (firma, momento en que se vio esa firma por primera vez)
+        self._vistos = {}
+        # zip -> firmas (zip, csv) del último trabajo terminado, leídas del diario
+        self.terminados = self._leer_diario()
+        # future -> (zip, firmas)
+        self._en_curso = {}
+
+    def _leer_diario(self):
+        terminados = {}
+        if not os.path.exists(self.ruta_diario):
+            return terminados
+        with open(self.ruta_diario, encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    entrada = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue  # línea cortada por un corte del proceso
+                if entrada.get('evento') in ('ok', 'error'):
+                    terminados[entrada['zip']] = entrada['firmas']
+        return terminados
+
+    def _anotar(self, **entrada):
+        entrada = {'momento': datetime.now().isoformat(timespec='seconds'), **entrada}
+        with open(self.ruta_diario, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _estable(self, ruta, ahora, confiar_en_mtime=False):
+        """
+        True si el archivo no cambió durante los últimos `espera` segundos, según lo
+        observado en las pasadas anteriores. Con confiar_en_mtime (una sola pasada, sin
+        observaciones previas) alcanza con que la fecha de modificación sea anterior.
+        """
+        try:
+            firma = _firma(ruta)
+        except OSError:
+            return False
+        if confiar_en_mtime:
+            return time.time() - firma[1] / 1e9 >= self.espera and self._legible(ruta)
+        anterior = self._vistos.get(ruta)
+        if anterior is None or anterior[0] != firma:
+            self._vistos[ruta] = (firma, ahora)
+            return self.espera <= 0 and self._legible(ruta)
+        return ahora - anterior[1] >= self.espera and self._legible(ruta)
+
+    @staticmethod
+    def _legible(ruta):
+        # Un ZIP a medio copiar todavía no tiene el directorio central al final
+        return not ruta.lower().endswith('.zip') or zipfile.is_zipfile(ruta)
+
+    def pares_listos(self, ahora=None, confiar_en_mtime=False):
+        """
+        Pares {'zip', 'csv', 'firmas'} completos cuyo resultado no está en el diario con
+        los mismos archivos ni en curso, en orden de nombre del ZIP.
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        rutas = [os.path.join(self.carpeta, n) for n in os.listdir(self.carpeta)]
+        estables = {r for r in rutas if os.path.isfile(r) and self._estable(r, ahora, confiar_en_mtime)}
+        self._vistos = {r: v for r, v in self._vistos.items() if r in rutas}
+
+        csv_por_fecha = {}
+        for ruta in sorted(estables):
+            if ruta.lower().endswith('.csv'):
+                fecha = fecha_del_nombre(os.path.basename(ruta))
+                if fecha:
+                    # Si hay varios CSV de la misma fecha se usa el último por nombre
+                    csv_por_fecha[fecha] = ruta
+
+        en_curso = {zip_path for zip_path, _ in self._en_curso.values()}
+        pares = []
+        for ruta in sorted(estables):
+            if not ruta.lower().endswith('.zip') or ruta in en_curso:
+                continue
+            try:
+                fecha = fecha_del_zip(ruta)
+            except (OSError, zipfile.BadZipFile):
+                continue
+            csv_path = csv_por_fecha.get(fecha)
+            if csv_path is None:
+                continue
+            try:
+                firmas = [_firma(ruta), _firma(csv_path)]
+            except OSError:
+                continue  # se borró o movió desde que se listó la carpeta
+            if self.terminados.get(ruta) != firmas:
+                pares.append({'zip': ruta, 'csv': csv_path, 'firmas': firmas})
+        return pares
+
+    def _encolar(self, executor, par):
+        self._anotar(evento='inicio', zip=par['zip'], csv=par['csv'], firmas=par['firmas'])
+        futuro = executor.submit(self.tarea, {'zip': par['zip'], 'csv': par['csv']})
+        self._en_curso[futuro] = (par['zip'], par['firmas'])
+        self.avisar(f"Procesando {os.path.basename(par['zip'])} con {os.path.basename(par['csv'])}")
+
+    def _terminar(self, futuro):
+        """Anota el resultado del trabajo. Retorna False si el pool quedó roto."""
+        zip_path, firmas = self._en_curso.pop(futuro)
+        pool_sano = True
+        try:
+            resumen = futuro.result()
+        except Exception as e:  # el proceso del worker murió
+            resumen = {'zip': zip_path, 'estado': 'error', 'error': f"{type(e).__name__}: {e}"}
+            pool_sano = not isinstance(e, BrokenProcessPool)
+        resumen.pop('eventos', None)
+        # 'reporte' es el nombre base (.xlsx); los archivos escritos están en 'archivos'
+        resumen.pop('reporte', None)
+        # Los errores también cuentan como terminados: se reintenta solo si cambian los archivos
+        self.terminados[zip_path] = firmas
+        try:
+            self._anotar(evento=resumen['estado'], firmas=firmas, **resumen)
+        except OSError as e:
+            self.avisar(f"No se pudo anotar en el diario {self.ruta_diario}: {e}")
+        detalle = ', '.join(resumen.get('archivos', [])) if resumen['estado'] == 'ok' else resumen['error']
+        self.avisar(f"[{resumen['estado']}] {os.path.basename(zip_path)}: {detalle}")
+        return pool_sano
+
+    def _terminar_todos(self, futuros):
+        """Anota los trabajos terminados. Retorna False si alguno encontró el pool roto."""
+        return all([self._terminar(futuro) for futuro in futuros])
+
+    def _reiniciar_pool(self, executor):
+        # Si un worker muere (falta de memoria, crash) el pool no acepta más trabajos y
+        # todos los que tenía en curso fallan con BrokenProcessPool; se arma uno nuevo
+        self.avisar("Un proceso del pool terminó de forma inesperada; se reinicia el pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def vigilar(self, intervalo=10, una_vez=False, detener=None):
+        """
+        Revisa la carpeta cada `intervalo` segundos y procesa los pares listos.
+        Con una_vez=True hace una sola pasada, en la que se toman los archivos que no se
+        modificaron en los últimos `espera` segundos, y espera que terminen sus trabajos.
+        detener es una función opcional sin argumentos; si devuelve True se deja de
+        vigilar después de terminar los trabajos en curso.
+
+        Si un proceso del pool muere, los trabajos que estaban en curso quedan anotados
+        como error y se sigue vigilando con un pool nuevo.
+        """
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            while True:
+                libres = self.workers - len(self._en_curso)
+                # Un error de disco o de red en una revisión (la carpeta compartida que
+                # desaparece un momento, el diario que no se puede escribir) no detiene
+                # la vigilancia: se avisa y se reintenta en la próxima revisión
+                try:
+                    listos = self.pares_listos(confiar_en_mtime=una_vez)
+                    # En una sola pasada se encolan todos; el pool igual corre de a workers
+                    for par in listos if una_vez else listos[:libres]:
+                        self._encolar(executor, par)
+                except OSError as e:
+                    self.avisar(f"Error al revisar {self.carpeta}: {e}")
+                except BrokenProcessPool:
+                    # El par que no se pudo encolar no quedó en curso: se toma en la próxima revisión
+                    executor = self._reiniciar_pool(executor)
+
+                if una_vez or (detener and detener()):
+                    wait(list(self._en_curso))
+                    self._terminar_todos(list(self._en_curso))
+                    return
+
+                if self._en_curso:
+                    terminados, _ = wait(list(self._en_curso), timeout=intervalo, return_when=FIRST_COMPLETED)
+                    if not self._terminar_todos(terminados):
+                        # Los demás trabajos del pool roto también fallaron: se anotan ya
+                        wait(list(self._en_curso))
+                        self._terminar_todos(list(self._en_curso))
+                        executor = self._reiniciar_pool(executor)
+                else:
+                    time.sleep(intervalo)
+        finally:
+            executor.shutdown(wait=True)
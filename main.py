@@ -1,8 +1,11 @@
 import sys
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
 from ui.main_win import MainWindow
 
 def main():
+    # Necesario para el pool de procesos en el ejecutable congelado (PyInstaller)
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
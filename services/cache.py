@@ -0,0 +1,136 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Cambiar este valor cuando cambie el formato de lo que devuelven los parsers,
+# así las entradas viejas dejan de coincidir.
+VERSION_CACHE = 3
+
+# Tamaño máximo por defecto del cache en disco
+LIMITE_POR_DEFECTO = 2 * 1024 ** 3
+
+_EXTENSION = '.pkl'
+
+
+def directorio_por_defecto():
+    """Carpeta de cache del usuario (LOCALAPPDATA en Windows, XDG_CACHE_HOME o ~/.cache)."""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'comparador_faltas')
+
+
+def hash_archivo(ruta, bloque=1024 * 1024):
+    """SHA-256 del contenido del archivo, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for datos in iter(lambda: f.read(bloque), b''):
+            h.update(datos)
+    return h.hexdigest()
+
+
+def clave(*partes):
+    """
+    Clave de cache a partir de las partes que identifican el contenido y cómo se parseó.
+    Incluye las versiones de pandas y numpy: el cache sobrevive a las actualizaciones y
+    un pickle de otra versión puede no cargarse.
+    """
+    version = (VERSION_CACHE, pd.__version__, np.__version__)
+    return hashlib.sha256(repr(version + partes).encode('utf-8')).hexdigest()
+
+
+class CacheParseo:
+    """
+    Cache en disco de DataFrames ya parseados, direccionado por contenido.
+
+    Cada entrada es un pickle (protocolo 5) cuyo nombre es la clave. Al leer una entrada
+    se actualiza su fecha de modificación, y al superar limite_bytes se borran las
+    entradas usadas hace más tiempo (LRU).
+    """
+
+    def __init__(self, directorio=None, limite_bytes=LIMITE_POR_DEFECTO):
+        self.directorio = directorio or directorio_por_defecto()
+        self.limite_bytes = limite_bytes
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + _EXTENSION)
+
+    def obtener(self, clave):
+        """
+        Devuelve el objeto guardado con esa clave, o None si no está o no se puede
+        cargar (entrada dañada o escrita por otra versión); en ese caso se borra.
+        """
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as f:
+                valor = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Un fallo del cache nunca debe cortar el proceso: se vuelve a parsear
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            return None
+        try:
+            os.utime(ruta)
+        except FileNotFoundError:
+            pass
+        return valor
+
+    def guardar(self, clave, valor):
+        """Guarda el objeto de forma atómica y aplica el límite de tamaño."""
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(valor, f, protocol=5)
+            os.replace(temporal, self._ruta(clave))
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        self._desalojar()
+
+    def _entradas(self):
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(_EXTENSION):
+                try:
+                    estado = os.stat(os.path.join(self.directorio, nombre))
+                except FileNotFoundError:
+                    continue
+                entradas.append((estado.st_mtime, estado.st_size, nombre))
+        return entradas
+
+    def _desalojar(self):
+        entradas = sorted(self._entradas())
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, nombre in entradas:
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except FileNotFoundError:
+                pass
+            total -= tamano
+
+    def tamano(self):
+        """(cantidad de entradas, bytes ocupados)."""
+        entradas = self._entradas()
+        return len(entradas), sum(tamano for _, tamano, _ in entradas)
+
+    def limpiar(self):
+        """Invalida todo el cache. Devuelve la cantidad de entradas borradas."""
+        borradas = 0
+        for _, _, nombre in self._entradas():
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+                borradas += 1
+            except FileNotFoundError:
+                pass
+        return borradas
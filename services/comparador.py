@@ -1,23 +1,114 @@
+import numpy as np
 import pandas as pd
 
-def roman_to_int(roman: str) -> int:
+# Estados posibles de cada fila del reporte, en orden de precedencia.
+ESTADOS = ['NO PEDIDO', 'NO ENVIADO', 'COMPLETO', 'INCOMPLETO', 'ERRONEO']
+
+# Tipos de las claves del merge, desde la ingesta hasta el reporte final.
+DTYPES_CLAVES = {'SUCURSAL': 'int16', 'TROQUEL': 'int32'}
+
+
+# Cómo se resume cada columna de llegadas por (SUCURSAL, TROQUEL).
+AGREGACION_LLEGADAS = {
+    'CANTIDAD_ENVIADA': 'sum',
+    'NUMERO_ENVIO': 'first',
+    'FECHA_ENVIO': 'first',
+    'FECHA_RECEPCION': 'max',   # O 'first', según convenga
+    'ESTADO_LLEGADA': 'first',
+    'DESCRIPCION_LLEGADA': 'first'
+}
+
+
+class ClavesInvalidasError(ValueError):
+    """Hay filas cuya SUCURSAL o TROQUEL no es un entero válido."""
+
+def normalizar_claves(df, origen):
     """
-    Convierte un número romano en un entero.
-    Soporta símbolos básicos: I, V, X, L, C, D, M.
+    Convierte SUCURSAL y TROQUEL de df (en el lugar) a los enteros de DTYPES_CLAVES.
+    Si alguna fila tiene una clave vacía, no numérica o fuera de rango lanza
+    ClavesInvalidasError indicando el origen y algunos de los valores problemáticos,
+    en lugar de convertirla en 0 en silencio.
+    """
+    for col, dtype in DTYPES_CLAVES.items():
+        if df[col].dtype == dtype:
+            continue
+        valores = pd.to_numeric(df[col], errors='coerce').astype('Float64')
+        limites = np.iinfo(dtype)
+        invalidos = (
+            valores.isna() | (valores % 1 != 0) | (valores < limites.min) | (valores > limites.max)
+        ).to_numpy(dtype=bool, na_value=True)
+        if invalidos.any():
+            ejemplos = ', '.join(repr(v) for v in df.loc[invalidos, col].astype(str).unique()[:5])
+            raise ClavesInvalidasError(
+                f"{origen}: {invalidos.sum()} fila(s) con {col} no numérico o fuera de rango "
+                f"(ej.: {ejemplos})"
+            )
+        df[col] = valores.astype(dtype)
+    return df
+
+def clasificar_estado(cantidad_pedida, cantidad_enviada, fecha_recepcion):
     """
-    valores = {
-        'I': 1, 'V': 5, 'X': 10,
-        'L': 50, 'C': 100, 'D': 500, 'M': 1000
-    }
-    total = 0
-    roman = roman.upper()  # Asegurarse de que esté en mayúsculas
-    for i in range(len(roman)):
-        # Si el siguiente símbolo es mayor, resta en lugar de sumar
-        if i + 1 < len(roman) and valores[roman[i]] < valores[roman[i + 1]]:
-            total -= valores[roman[i]]
-        else:
-            total += valores[roman[i]]
-    return total
+    Asigna el ESTADO de cada fila con máscaras vectorizadas, respetando la precedencia:
+      - NO PEDIDO: la cantidad pedida es 0.
+      - NO ENVIADO: FECHA RECEPCION está vacía.
+      - COMPLETO / INCOMPLETO / ERRONEO: pedida ==, > o < enviada.
+    Retorna un Categorical con las categorías de ESTADOS.
+    """
+    pedida = cantidad_pedida.to_numpy(dtype=float, na_value=np.nan)
+    enviada = cantidad_enviada.to_numpy(dtype=float, na_value=np.nan)
+    condiciones = [
+        pedida == 0,
+        fecha_recepcion.isna().to_numpy(),
+        pedida == enviada,
+        pedida > enviada,
+        pedida < enviada,
+    ]
+    codigos = np.select(condiciones, range(len(ESTADOS)), default=-1)
+    return pd.Categorical.from_codes(codigos, categories=ESTADOS)
+
+def _como_categorica(serie):
+    return serie if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype('category')
+
+
+def compartir_categorias(frames, columna):
+    """
+    Recodifica la columna de todos los frames como categórica sobre un diccionario común
+    (la unión de sus categorías), así pd.concat la mantiene categórica en lugar de
+    pasarla a object. Modifica los frames en el lugar y los retorna.
+    """
+    for df in frames:
+        df[columna] = _como_categorica(df[columna])
+    categorias = frames[0][columna].cat.categories.append(
+        [df[columna].cat.categories for df in frames[1:]]
+    ).unique()
+    for df in frames:
+        if not df[columna].cat.categories.equals(categorias):
+            df[columna] = df[columna].cat.set_categories(categorias)
+    return frames
+
+
+def combinar_descripciones(principal, alternativa):
+    """
+    Equivale a principal.fillna(alternativa), pero sobre categóricas: las dos se
+    recodifican con un diccionario común y se eligen códigos, sin armar strings.
+    Retorna una serie categórica solo con las descripciones que se usan.
+    """
+    principal, alternativa = _como_categorica(principal), _como_categorica(alternativa)
+    categorias = principal.cat.categories.append(alternativa.cat.categories).unique()
+    codigos_principal = principal.cat.set_categories(categorias).cat.codes.to_numpy()
+    codigos_alternativa = alternativa.cat.set_categories(categorias).cat.codes.to_numpy()
+    codigos = np.where(codigos_principal >= 0, codigos_principal, codigos_alternativa)
+    combinada = pd.Categorical.from_codes(codigos, categories=categorias).remove_unused_categories()
+    return pd.Series(combinada, index=principal.index, name=principal.name)
+
+
+def agrupar_llegadas(df_llegadas):
+    """
+    Agrupa las llegadas por SUCURSAL y TROQUEL según AGREGACION_LLEGADAS.
+    Como sum/first/max se pueden componer, aplicarla sobre resultados parciales
+    ya agrupados (en orden) da lo mismo que aplicarla sobre todas las filas.
+    """
+    return df_llegadas.groupby(['SUCURSAL', 'TROQUEL'], as_index=False).agg(AGREGACION_LLEGADAS)
 
 def comparar_dataframes(df_pedidos, df_llegadas):
     """
@@ -45,12 +136,13 @@ def comparar_dataframes(df_pedidos, df_llegadas):
       - NO ENVIADO: Si FECHA RECEPCION está vacía.
       - NO PEDIDO: Si no se realizó pedido (por ejemplo, la cantidad pedida es 0).
       
-    Finalmente, se convierten las columnas SUCURSAL, CODBARRA, TROQUEL y las cantidades a enteros.
+    SUCURSAL y TROQUEL se manejan como enteros (ver DTYPES_CLAVES) durante todo el proceso;
+    si alguna clave no es numérica se lanza ClavesInvalidasError.
+    Finalmente, se convierten las columnas CODBARRA y las cantidades a enteros.
     """
-    # Aseguramos que las claves sean cadenas sin espacios extra.
-    for col in ['SUCURSAL', 'TROQUEL']:
-        df_pedidos[col] = df_pedidos[col].astype(str).str.strip()
-        df_llegadas[col] = df_llegadas[col].astype(str).str.strip()
+    # Aseguramos que las claves sean enteros compactos (int16 / int32).
+    normalizar_claves(df_pedidos, 'Pedidos')
+    normalizar_claves(df_llegadas, 'Llegadas')
         
     # Convertir a numérico las cantidades en cada DataFrame.
     df_pedidos['CANTIDAD_PEDIDA'] = pd.to_numeric(df_pedidos['CANTIDAD_PEDIDA'], errors='coerce')
@@ -65,14 +157,8 @@ def comparar_dataframes(df_pedidos, df_llegadas):
     })
     
     # Agrupar el DataFrame de llegadas por SUCURSAL y TROQUEL, incluyendo la columna DESCRIPCION_LLEGADA.
-    llegadas_agrupadas = df_llegadas.groupby(['SUCURSAL', 'TROQUEL'], as_index=False).agg({
-        'CANTIDAD_ENVIADA': 'sum',
-        'NUMERO_ENVIO': 'first',
-        'FECHA_ENVIO': 'first',
-        'FECHA_RECEPCION': 'max',   # O 'first', según convenga
-        'ESTADO_LLEGADA': 'first',
-        'DESCRIPCION_LLEGADA': 'first'
-    })
+    # Si df_llegadas ya viene agrupado (lectura por chunks) esto no cambia los valores.
+    llegadas_agrupadas = agrupar_llegadas(df_llegadas)
     
     # Realizar el merge outer para incluir filas de ambos DataFrames
     df_merged = pd.merge(
@@ -92,8 +178,9 @@ def comparar_dataframes(df_pedidos, df_llegadas):
     # Calcular la diferencia: (lo que llegó) - (lo pedido)
     df_merged['DIFERENCIAS'] = df_merged['CANTIDAD_ENVIADA'] - df_merged['CANTIDAD_PEDIDA']
     
-    # Rellenar la columna PRODUCTO combinando DESCRIPCION_LLEGADA y DESCRIPCION (si falta, usa la otra)
-    df_merged['PRODUCTO'] = df_merged['DESCRIPCION_LLEGADA'].fillna(df_merged['DESCRIPCION'])
+    # Rellenar la columna PRODUCTO combinando DESCRIPCION_LLEGADA y DESCRIPCION (si falta, usa la otra).
+    # Las descripciones son categóricas: se combinan los códigos con un diccionario común.
+    df_merged['PRODUCTO'] = combinar_descripciones(df_merged['DESCRIPCION_LLEGADA'], df_merged['DESCRIPCION'])
     
     # Seleccionar las columnas finales en el orden deseado.
     df_final = df_merged[[ 
@@ -118,35 +205,29 @@ def comparar_dataframes(df_pedidos, df_llegadas):
         'FECHA_RECEPCION': 'FECHA RECEPCION'
     }, inplace=True)
     
-    # Definir la función para asignar el estado
-    def get_estado(row):
-        # Si la cantidad pedida es 0, se asume que no se realizó el pedido.
-        if row['CANTIDAD PEDIDA'] == 0:
-            return 'NO PEDIDO'
-        # Si FECHA RECEPCION es nula, se considera NO ENVIADO.
-        if pd.isnull(row['FECHA RECEPCION']):
-            return 'NO ENVIADO'
-        # Comparar cantidades:
-        if row['CANTIDAD PEDIDA'] == row['CANTIDAD ENVIADA']:
-            return 'COMPLETO'
-        elif row['CANTIDAD PEDIDA'] > row['CANTIDAD ENVIADA']:
-            return 'INCOMPLETO'
-        elif row['CANTIDAD PEDIDA'] < row['CANTIDAD ENVIADA']:
-            return 'ERRONEO'
-        else:
-            return ''
-    
-    df_final['ESTADO'] = df_final.apply(get_estado, axis=1)
+    df_final['ESTADO'] = clasificar_estado(
+        df_final['CANTIDAD PEDIDA'], df_final['CANTIDAD ENVIADA'], df_final['FECHA RECEPCION']
+    )
     
-    # Convertir las columnas SUCURSAL, CODBARRA, TROQUEL y las cantidades a enteros.
-    df_final['SUCURSAL'] = pd.to_numeric(df_final['SUCURSAL'], errors='coerce').fillna(0).astype(int)
+    # Convertir CODBARRA y las cantidades a enteros (SUCURSAL y TROQUEL ya lo son).
     df_final['CODBARRA'] = pd.to_numeric(df_final['CODBARRA'], errors='coerce').fillna(0).astype(int)
-    df_final['TROQUEL'] = pd.to_numeric(df_final['TROQUEL'], errors='coerce').fillna(0).astype(int)
     df_final['CANTIDAD PEDIDA'] = pd.to_numeric(df_final['CANTIDAD PEDIDA'], errors='coerce').fillna(0).astype(int)
     df_final['CANTIDAD ENVIADA'] = pd.to_numeric(df_final['CANTIDAD ENVIADA'], errors='coerce').fillna(0).astype(int)
     df_final['DIFERENCIAS'] = pd.to_numeric(df_final['DIFERENCIAS'], errors='coerce').fillna(0).astype(int)
     
-    df_final = df_final.sort_values(by='SUCURSAL')
+    df_final = df_final.sort_values(by='SUCURSAL', kind='stable')
 
     return df_final
 
+
+
+def resumen_por_estado(df_resultado):
+    """
+    Cantidad de filas del reporte por SUCURSAL y ESTADO: una fila por sucursal, una
+    columna por cada ESTADOS (en ese orden, con 0 si no hay) y TOTAL.
+    """
+    conteo = pd.crosstab(df_resultado['SUCURSAL'], pd.Categorical(df_resultado['ESTADO'], categories=ESTADOS))
+    conteo = conteo.reindex(columns=ESTADOS, fill_value=0)
+    conteo.columns = list(ESTADOS)
+    conteo['TOTAL'] = conteo.sum(axis=1)
+    return conteo
@@ -0,0 +1,82 @@
+import codecs
+import io
+from collections import namedtuple
+
+# Bytes que se leen del principio del archivo para detectar encoding, cabecera y separador
+MUESTRA_BYTES = 16 * 1024
+
+SEPARADORES = (';', ',', '\t', '|')
+
+# Marcas de orden de bytes, de la más larga a la más corta (UTF-32 empieza como UTF-16)
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# fila_cabecera: índice (desde 0) de la línea con los nombres de columna, que es la
+# cantidad de líneas a saltear con skiprows.
+DialectoCSV = namedtuple('DialectoCSV', ['encoding', 'separador', 'decimal', 'fila_cabecera'])
+
+
+def detectar_encoding(muestra):
+    """
+    Encoding de un archivo a partir de sus primeros bytes: el de la BOM si tiene una,
+    'utf-8' si la muestra es UTF-8 válido y si no 'latin-1' (que acepta cualquier byte).
+    """
+    for bom, encoding in _BOMS:
+        if muestra.startswith(bom):
+            return encoding
+    try:
+        # final=False: la muestra puede cortar un carácter multibyte al final
+        codecs.getincrementaldecoder('utf-8')().decode(muestra, final=False)
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'utf-8'
+
+
+def decodificar_texto(datos):
+    """
+    Decodifica el contenido completo de un archivo de texto ya leído en memoria,
+    detectando el encoding con los primeros MUESTRA_BYTES. Si un carácter no UTF-8
+    aparece recién después de la muestra, se vuelve a decodificar como latin-1 (en
+    memoria, sin volver a leer el archivo). Los saltos de línea quedan como '\\n'.
+    """
+    encoding = detectar_encoding(datos[:MUESTRA_BYTES])
+    try:
+        texto = datos.decode(encoding)
+    except UnicodeDecodeError:
+        texto = datos.decode('latin-1')
+    # Los mismos saltos de línea universales que open(), sin decodificar de nuevo
+    return texto.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def detectar_dialecto_csv(ruta, columnas_requeridas, tamano_muestra=MUESTRA_BYTES):
+    """
+    Lee solo los primeros tamano_muestra bytes del CSV y detecta el encoding, la línea
+    de cabecera (la primera que contiene todas las columnas_requeridas) y el separador.
+    El separador decimal es ',' salvo que el separador de campos sea la coma.
+
+    Lanza ValueError si la cabecera no aparece en la muestra, así un archivo con otro
+    formato falla enseguida en lugar de después de leerlo entero.
+    """
+    with open(ruta, 'rb') as f:
+        muestra = f.read(tamano_muestra)
+    encoding = detectar_encoding(muestra)
+    # newline=None separa las líneas igual que el lector de pandas (\n, \r\n o \r)
+    lineas = io.StringIO(muestra.decode(encoding, errors='replace'), newline=None)
+
+    requeridas = set(columnas_requeridas)
+    for numero, linea in enumerate(lineas):
+        linea = linea.rstrip('\n')
+        for separador in SEPARADORES:
+            campos = {campo.strip().strip('"') for campo in linea.split(separador)}
+            if requeridas <= campos:
+                return DialectoCSV(encoding, separador, '.' if separador == ',' else ',', numero)
+
+    raise ValueError(
+        f"No se encontró la cabecera del CSV ({', '.join(columnas_requeridas)}) "
+        f"en los primeros {tamano_muestra // 1024} KB de {ruta}"
+    )
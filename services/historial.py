@@ -0,0 +1,150 @@
+import sqlite3
+
+import pandas as pd
+
+# Columnas del reporte -> columnas de la tabla de historial
+COLUMNAS_HISTORIAL = {
+    'SUCURSAL': 'sucursal',
+    'CODBARRA': 'codbarra',
+    'TROQUEL': 'troquel',
+    'PRODUCTO': 'producto',
+    'CANTIDAD PEDIDA': 'cantidad_pedida',
+    'CANTIDAD ENVIADA': 'cantidad_enviada',
+    'DIFERENCIAS': 'diferencias',
+    'NUMERO DE ENVIO': 'numero_envio',
+    'FECHA DE ENVIO': 'fecha_envio',
+    'FECHA RECEPCION': 'fecha_recepcion',
+    'ESTADO': 'estado',
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    periodo          TEXT    NOT NULL,
+    fuente           TEXT,
+    sucursal         INTEGER NOT NULL,
+    codbarra         INTEGER,
+    troquel          INTEGER NOT NULL,
+    producto         TEXT,
+    cantidad_pedida  INTEGER,
+    cantidad_enviada INTEGER,
+    diferencias      INTEGER,
+    numero_envio     INTEGER,
+    fecha_envio      TEXT,
+    fecha_recepcion  TEXT,
+    estado           TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_sucursal_troquel_periodo ON resultados (sucursal, troquel, periodo);
+CREATE INDEX IF NOT EXISTS ix_troquel_periodo ON resultados (troquel, periodo);
+CREATE INDEX IF NOT EXISTS ix_estado_sucursal_periodo ON resultados (estado, sucursal, periodo);
+CREATE INDEX IF NOT EXISTS ix_periodo ON resultados (periodo);
+"""
+
+# Índice que se crea después de migrar las bases anteriores a la columna fuente
+_INDICE_FUENTE = "CREATE INDEX IF NOT EXISTS ix_periodo_fuente ON resultados (periodo, fuente)"
+
+
+def _valores_sql(serie):
+    """Valores de la columna listos para sqlite3: fechas ISO y None en lugar de NaN/NaT/NA."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        serie = serie.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif pd.api.types.is_float_dtype(serie) and (serie.dropna() % 1 == 0).all():
+        serie = serie.astype('Int64')
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+class HistorialResultados:
+    """
+    Historial de resultados de comparar_dataframes en una base SQLite local. Cada fila
+    lleva su período (ej. '2025-03-01' o '2025-W10') y su fuente (el reporte del que
+    salió), así varios pares pueden cargarse en el mismo período. Tiene índices por
+    (sucursal, troquel, período), (troquel, período) y (estado, sucursal, período),
+    para consultar meses de historia sin cargar todo en memoria.
+    """
+
+    def __init__(self, ruta_db):
+        self.ruta_db = ruta_db
+        con = self._conectar()
+        try:
+            # WAL: las consultas no se bloquean mientras otro proceso agrega un período
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_ESQUEMA)
+            # Las bases creadas antes de la columna fuente la reciben vacía (NULL)
+            if 'fuente' not in {fila[1] for fila in con.execute("PRAGMA table_info(resultados)")}:
+                con.execute("ALTER TABLE resultados ADD COLUMN fuente TEXT")
+            con.execute(_INDICE_FUENTE)
+            con.commit()
+        finally:
+            con.close()
+
+    def _conectar(self):
+        # timeout alto: varios procesos del modo lote pueden escribir a la vez
+        con = sqlite3.connect(self.ruta_db, timeout=60)
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    def agregar(self, df_resultado, periodo, fuente):
+        """
+        Guarda el reporte como el período y la fuente indicados (ej. el nombre del
+        reporte). Si ya había filas de esa fuente en ese período se reemplazan, así
+        volver a procesar un par no duplica filas; las de otras fuentes no se tocan.
+        Retorna la cantidad de filas guardadas.
+        """
+        columnas = list(COLUMNAS_HISTORIAL.values())
+        valores = [_valores_sql(df_resultado[col]) for col in COLUMNAS_HISTORIAL]
+        filas = ((periodo, fuente, *fila) for fila in zip(*valores))
+        marcadores = ', '.join('?' * (len(columnas) + 2))
+        con = self._conectar()
+        try:
+            with con:
+                con.execute("DELETE FROM resultados WHERE periodo = ? AND fuente = ?", (periodo, fuente))
+                con.executemany(
+                    f"INSERT INTO resultados (periodo, fuente, {', '.join(columnas)}) VALUES ({marcadores})", filas
+                )
+        finally:
+            con.close()
+        return len(df_resultado)
+
+    def periodos(self):
+        """Períodos guardados, ordenados."""
+        con = self._conectar()
+        try:
+            return [p for (p,) in con.execute("SELECT DISTINCT periodo FROM resultados ORDER BY periodo")]
+        finally:
+            con.close()
+
+    def consultar(self, sucursal=None, troquel=None, estado=None, desde=None, hasta=None, limite=None):
+        """
+        Filas del historial que cumplen todos los filtros indicados (los None no filtran).
+        desde/hasta son períodos inclusive. Retorna un DataFrame ordenado por período,
+        sucursal y troquel, con los nombres de columna del reporte más PERIODO y FUENTE.
+        """
+        condiciones, parametros = [], []
+        for columna, valor in (('sucursal', sucursal), ('troquel', troquel), ('estado', estado)):
+            if valor is not None:
+                condiciones.append(f"{columna} = ?")
+                parametros.append(valor)
+        if desde is not None:
+            condiciones.append("periodo >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("periodo <= ?")
+            parametros.append(hasta)
+
+        consulta = "SELECT * FROM resultados"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY periodo, sucursal, troquel"
+        if limite is not None:
+            consulta += f" LIMIT {int(limite)}"
+
+        con = self._conectar()
+        try:
+            df = pd.read_sql_query(consulta, con, params=parametros)
+        finally:
+            con.close()
+        nombres = {v: k for k, v in COLUMNAS_HISTORIAL.items()}
+        nombres.update(periodo='PERIODO', fuente='FUENTE')
+        df = df.rename(columns=nombres)
+        for col in ('FECHA DE ENVIO', 'FECHA RECEPCION'):
+            df[col] = pd.to_datetime(df[col])
+        return df
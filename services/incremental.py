@@ -0,0 +1,192 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from services.comparador import AGREGACION_LLEGADAS, comparar_dataframes, normalizar_claves
+
+# Cambiar si cambia la lógica de comparar_dataframes: invalida los estados guardados.
+VERSION_ESTADO = 1
+
+# Un estado guardado con otra versión de pandas o numpy puede no cargarse bien
+_VERSION_COMPLETA = (VERSION_ESTADO, pd.__version__, np.__version__)
+
+# Columnas de cada entrada que influyen en el reporte
+COLUMNAS_PEDIDOS = ['SUCURSAL', 'TROQUEL', 'CANTIDAD_PEDIDA', 'CODBARRA', 'DESCRIPCION', 'Fecha_Envio']
+COLUMNAS_LLEGADAS = ['SUCURSAL', 'TROQUEL', *AGREGACION_LLEGADAS]
+
+
+def hashes_por_sucursal(df, columnas):
+    """
+    Hash del contenido de cada partición SUCURSAL de df (solo las columnas indicadas),
+    sensible al orden de las filas. Retorna {sucursal: hash hexadecimal}.
+    """
+    filas = pd.util.hash_pandas_object(df[columnas], index=False).to_numpy()
+    return {
+        int(sucursal): hashlib.blake2b(filas[posiciones].tobytes(), digest_size=16).hexdigest()
+        for sucursal, posiciones in df.groupby('SUCURSAL', sort=False).indices.items()
+    }
+
+
+def _leer_pickle(ruta):
+    """Objeto guardado en ruta, o None si no hay o no se puede cargar (nunca lanza)."""
+    try:
+        with open(ruta, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _leer_estado(ruta_estado):
+    """
+    Índice de la corrida anterior, o None si no hay o no se puede usar (dañado, de otra
+    versión o de otro pandas/numpy): en ese caso se recalcula todo, nunca se corta.
+    """
+    estado = _leer_pickle(ruta_estado)
+    if not isinstance(estado, dict) or estado.get('version') != _VERSION_COMPLETA:
+        return None
+    return estado
+
+
+def _guardar_pickle(ruta, objeto):
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(carpeta, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=carpeta, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(objeto, f, protocol=5)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def _carpeta_partes(ruta_estado):
+    return ruta_estado + '.partes'
+
+
+def _nombre_parte(sucursal, huellas, diccionario):
+    # El nombre depende de las huellas y del diccionario de PRODUCTO: nunca se pisa una
+    # parte que el índice vigente usa
+    firma = repr((huellas, diccionario)).encode('utf-8')
+    return f"{sucursal}-{hashlib.blake2b(firma, digest_size=8).hexdigest()}.pkl"
+
+
+def _leer_parte(ruta_estado, nombre):
+    parte = _leer_pickle(os.path.join(_carpeta_partes(ruta_estado), nombre))
+    return parte if isinstance(parte, pd.DataFrame) else None
+
+
+def _guardar_estado(ruta_estado, indice, partes_nuevas):
+    """
+    Guarda las partes nuevas del reporte (una por sucursal recalculada), después el
+    índice y por último borra las partes que ya no usa el índice. Si el proceso se
+    corta en el medio, el índice anterior sigue apuntando a partes que existen.
+    """
+    carpeta = _carpeta_partes(ruta_estado)
+    for nombre, parte in partes_nuevas.items():
+        _guardar_pickle(os.path.join(carpeta, nombre), parte)
+    _guardar_pickle(ruta_estado, {'version': _VERSION_COMPLETA, **indice})
+    vigentes = set(indice['partes'].values())
+    for nombre in os.listdir(carpeta) if os.path.isdir(carpeta) else []:
+        if nombre not in vigentes:
+            try:
+                os.remove(os.path.join(carpeta, nombre))
+            except OSError:
+                pass
+
+
+def _codificar_productos(df, productos):
+    """
+    df con PRODUCTO como códigos enteros sobre productos (Index). Las descripciones que
+    no están se agregan al final, así los códigos ya guardados siguen valiendo.
+    Retorna (df, productos).
+    """
+    producto = df['PRODUCTO']
+    faltantes = producto.cat.categories.difference(productos, sort=False)
+    if len(faltantes):
+        productos = productos.append(faltantes)
+    traduccion = productos.get_indexer(producto.cat.categories)
+    propios = producto.cat.codes.to_numpy()
+    df = df.assign(PRODUCTO=np.where(propios >= 0, traduccion[propios], -1).astype(np.int32))
+    return df, productos
+
+
+def comparar_incremental(df_pedidos, df_llegadas, ruta_estado, huellas_pedidos=None, huella_llegadas=None):
+    """
+    Igual que comparar_dataframes, pero reutilizando el reporte de la corrida anterior
+    guardado en ruta_estado. Solo se recalculan las sucursales cuyos pedidos o llegadas
+    cambiaron (según el CRC de sus TXT o el hash de su partición); las que ya no
+    aparecen se quitan y el resto de las filas se toman del reporte guardado.
+
+    El reporte se guarda por sucursal (en la carpeta "<ruta_estado>.partes"), con
+    PRODUCTO como códigos sobre un diccionario común guardado en el índice: una corrida
+    solo lee las partes que conserva, escribe las que recalcula y arma el reporte
+    concatenando enteros.
+
+    huellas_pedidos: {sucursal: huella} opcional para los pedidos, por ejemplo
+    file_controller.crc_por_sucursal(zip_path); evita hashear todas las filas.
+    huella_llegadas: huella opcional del archivo de llegadas completo (ej.
+    cache.hash_archivo); si coincide con la de la corrida anterior se reusan los hashes
+    por sucursal de las llegadas sin hashear sus filas.
+
+    Retorna (df_final, sucursales_recalculadas).
+    """
+    normalizar_claves(df_pedidos, 'Pedidos')
+    normalizar_claves(df_llegadas, 'Llegadas')
+    anterior = _leer_estado(ruta_estado)
+
+    h_pedidos = huellas_pedidos or hashes_por_sucursal(df_pedidos, COLUMNAS_PEDIDOS)
+    if anterior is not None and huella_llegadas is not None and anterior['huella_llegadas'] == huella_llegadas:
+        h_llegadas = {s: h for s, (_, h) in anterior['hashes'].items() if h is not None}
+    else:
+        h_llegadas = hashes_por_sucursal(df_llegadas, COLUMNAS_LLEGADAS)
+    hashes = {
+        sucursal: (h_pedidos.get(sucursal), h_llegadas.get(sucursal))
+        for sucursal in set(h_pedidos) | set(h_llegadas)
+    }
+
+    conservadas = {}
+    if anterior is not None:
+        for sucursal, h in hashes.items():
+            nombre = anterior['partes'].get(sucursal)
+            if nombre is not None and anterior['hashes'].get(sucursal) == h:
+                parte = _leer_parte(ruta_estado, nombre)
+                if parte is not None:
+                    conservadas[sucursal] = parte
+    recalculadas = sorted(set(hashes) - set(conservadas))
+
+    if not conservadas:
+        df_final = comparar_dataframes(df_pedidos, df_llegadas)
+        # Diccionario nuevo: las partes de índices anteriores no sirven con él
+        diccionario = os.urandom(8).hex()
+        codificado, productos = _codificar_productos(df_final, pd.Index([], dtype=object))
+    else:
+        diccionario, productos = anterior['diccionario'], anterior['productos']
+        codificado = None
+        if recalculadas:
+            recalculado = comparar_dataframes(
+                df_pedidos[df_pedidos['SUCURSAL'].isin(recalculadas)].copy(),
+                df_llegadas[df_llegadas['SUCURSAL'].isin(recalculadas)].copy()
+            )
+            codificado, productos = _codificar_productos(recalculado, productos)
+    nuevas = dict(tuple(codificado.groupby('SUCURSAL', sort=False))) if codificado is not None else {}
+
+    if conservadas:
+        # Mismo orden que comparar_dataframes: por SUCURSAL, y dentro de cada una el de su parte
+        partes = [conservadas.get(s, nuevas.get(s)) for s in sorted(set(conservadas) | set(nuevas))]
+        df_final = pd.concat(partes, ignore_index=True)
+        df_final['PRODUCTO'] = pd.Categorical.from_codes(
+            df_final['PRODUCTO'].to_numpy(), categories=productos
+        ).remove_unused_categories()
+
+    nombres = {s: _nombre_parte(s, hashes[s], diccionario) for s in set(conservadas) | set(nuevas)}
+    partes_nuevas = {nombres[s]: parte.reset_index(drop=True) for s, parte in nuevas.items()}
+    indice = {'hashes': hashes, 'huella_llegadas': huella_llegadas, 'partes': nombres,
+              'diccionario': diccionario, 'productos': productos}
+    _guardar_estado(ruta_estado, indice, partes_nuevas)
+    return df_final, recalculadas
@@ -0,0 +1,194 @@
+import ctypes
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows: no hay getrusage
+    resource = None
+
+# Contexto que se usa cuando la instrumentación está apagada. El dict que entrega se
+# comparte entre todas las etapas y se descarta: lo que se anote en él no se guarda.
+_ETAPA_NULA = nullcontext({})
+
+
+def _rss_actual_mb():
+    """Memoria residente actual del proceso, en MB (None si no se puede medir)."""
+    if sys.platform == 'win32':
+        return _rss_actual_mb_windows()
+    try:
+        # Linux: segundo campo de statm, en páginas
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(paginas * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+
+
+class _ContadoresMemoria(ctypes.Structure):
+    # PROCESS_MEMORY_COUNTERS de psapi.h
+    _fields_ = [('cb', ctypes.c_ulong), ('PageFaultCount', ctypes.c_ulong)] + [
+        (nombre, ctypes.c_size_t) for nombre in (
+            'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+            'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage',
+        )
+    ]
+
+
+def _rss_actual_mb_windows():
+    contadores = _ContadoresMemoria()
+    contadores.cb = ctypes.sizeof(contadores)
+    try:
+        proceso = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+            return None
+    except (AttributeError, OSError):
+        return None
+    return round(contadores.WorkingSetSize / 2**20, 1)
+
+
+def _rss_pico_proceso_mb():
+    """
+    Pico de memoria residente del proceso desde que arrancó, en MB (None si no se puede
+    medir). No es de una etapa: incluye los picos de todo lo que corrió antes.
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return round(pico / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+
+class Instrumentacion:
+    """
+    Registra cada etapa del proceso: tiempo de reloj, filas de entrada y de salida y
+    memoria:
+      - rss_inicio_mb / rss_fin_mb / rss_delta_mb: memoria residente del proceso al
+        empezar y al terminar la etapa, y cuánto creció (o bajó) durante ella.
+      - rss_pico_proceso_mb: pico de memoria residente del proceso hasta el final de la
+        etapa. Es acumulado: una etapa hereda los picos de las anteriores.
+      - tracemalloc_pico_mb (con usar_tracemalloc=True): pico de la propia etapa, que es
+        más preciso pero hace todo más lento.
+
+    Las etapas se pueden anidar; cada una queda como un evento con su profundidad.
+    Uso:
+        with instrumentacion.etapa('Comparar', filas_entrada=n) as registro:
+            df = ...
+            registro['filas_salida'] = len(df)
+    """
+
+    def __init__(self, usar_tracemalloc=False):
+        self.usar_tracemalloc = usar_tracemalloc
+        self.eventos = []
+        self._pila = []
+
+    @contextmanager
+    def etapa(self, nombre, filas_entrada=None):
+        registro = {'nombre': nombre, 'profundidad': len(self._pila), 'filas_entrada': filas_entrada,
+                    'filas_salida': None}
+        iniciar_tracemalloc = self.usar_tracemalloc and not tracemalloc.is_tracing()
+        if iniciar_tracemalloc:
+            tracemalloc.start()
+        elif self.usar_tracemalloc:
+            if self._pila:
+                # Se guarda el pico de la etapa padre antes de reiniciar el contador
+                padre = self._pila[-1]
+                padre['_pico_hijas'] = max(padre.get('_pico_hijas', 0), tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._pila.append(registro)
+        registro['rss_inicio_mb'] = _rss_actual_mb()
+        registro['inicio_us'] = time.time_ns() // 1000
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = time.perf_counter() - inicio
+            registro['rss_fin_mb'] = _rss_actual_mb()
+            registro['rss_delta_mb'] = None if None in (registro['rss_inicio_mb'], registro['rss_fin_mb']) \
+                else round(registro['rss_fin_mb'] - registro['rss_inicio_mb'], 1)
+            registro['rss_pico_proceso_mb'] = _rss_pico_proceso_mb()
+            if self.usar_tracemalloc:
+                # El pico de una etapa incluye el de sus subetapas (que reinician el contador)
+                pico = max(tracemalloc.get_traced_memory()[1], registro.pop('_pico_hijas', 0))
+                registro['tracemalloc_pico_mb'] = round(pico / 2**20, 1)
+                if iniciar_tracemalloc:
+                    tracemalloc.stop()
+            self._pila.pop()
+            if self._pila and self.usar_tracemalloc:
+                padre = self._pila[-1]
+                padre['_pico_hijas'] = max(padre.get('_pico_hijas', 0), pico)
+            self.eventos.append(registro)
+
+    def resumen(self):
+        """
+        Etapas agrupadas por nombre, en el orden en que empezaron: cantidad de llamadas,
+        segundos totales, filas de entrada y salida y variación de RSS sumadas, y RSS al
+        terminar y picos de memoria máximos.
+        """
+        por_nombre = {}
+        for evento in sorted(self.eventos, key=lambda e: e['inicio_us']):
+            etapa = por_nombre.setdefault(evento['nombre'], {
+                'nombre': evento['nombre'], 'profundidad': evento['profundidad'], 'llamadas': 0,
+                'segundos': 0.0, 'filas_entrada': None, 'filas_salida': None, 'rss_delta_mb': None,
+                'rss_fin_mb': None, 'rss_pico_proceso_mb': None, 'tracemalloc_pico_mb': None,
+            })
+            etapa['llamadas'] += 1
+            etapa['segundos'] += evento['segundos']
+            for clave in ('filas_entrada', 'filas_salida', 'rss_delta_mb'):
+                if evento[clave] is not None:
+                    etapa[clave] = (etapa[clave] or 0) + evento[clave]
+            for clave in ('rss_fin_mb', 'rss_pico_proceso_mb', 'tracemalloc_pico_mb'):
+                if evento.get(clave) is not None:
+                    etapa[clave] = max(etapa[clave] or 0, evento[clave])
+        for etapa in por_nombre.values():
+            etapa['segundos'] = round(etapa['segundos'], 4)
+            if etapa['rss_delta_mb'] is not None:
+                etapa['rss_delta_mb'] = round(etapa['rss_delta_mb'], 1)
+        return list(por_nombre.values())
+
+    def texto(self):
+        """Resumen corto de las etapas principales, para la barra de estado."""
+        return ' · '.join(
+            f"{etapa['nombre']} {etapa['segundos']:.2f}s" for etapa in self.resumen() if etapa['profundidad'] == 0
+        )
+
+    def guardar_json(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump({'etapas': self.resumen(), 'eventos': self.eventos}, f, indent=2, ensure_ascii=False)
+
+    def guardar_chrome_trace(self, ruta):
+        guardar_chrome_trace(ruta, [('proceso', self.eventos)])
+
+
+def medir(instrumentacion, nombre, filas_entrada=None):
+    """instrumentacion.etapa(...) o, si instrumentacion es None, un contexto que no hace nada."""
+    if instrumentacion is None:
+        return _ETAPA_NULA
+    return instrumentacion.etapa(nombre, filas_entrada)
+
+
+def guardar_chrome_trace(ruta, grupos):
+    """
+    Escribe los eventos en el formato de trazas de Chrome (chrome://tracing, Perfetto).
+    grupos es una lista de (nombre, eventos); cada grupo se muestra como un hilo aparte.
+    """
+    traza = []
+    for tid, (nombre_grupo, eventos) in enumerate(grupos, start=1):
+        traza.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': nombre_grupo}})
+        for evento in eventos:
+            traza.append({
+                'name': evento['nombre'],
+                'ph': 'X',
+                'ts': evento['inicio_us'],
+                'dur': round(evento['segundos'] * 1e6),
+                'pid': 1,
+                'tid': tid,
+                'args': {clave: valor for clave, valor in evento.items()
+                         if clave not in ('nombre', 'inicio_us', 'segundos', 'profundidad') and valor is not None},
+            })
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': traza, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
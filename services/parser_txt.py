@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Diseño de ancho fijo de cada línea de los TXT de pedidos de sucursal:
+# (columna, inicio, fin). El fin None significa "hasta el final de la línea".
+COLUMNAS_TXT = (
+    ('CODBARRA', 0, 13),
+    ('TROQUEL', 13, 20),
+    ('DESCRIPCION', 20, 50),
+    ('CANTIDAD_PEDIDA', 50, None),
+)
+
+# Códigos UCS-4 que se consideran relleno dentro de un campo numérico.
+_RELLENO = (0, 9, 32)
+
+# Máximo de dígitos que se acumulan en int64 sin riesgo de desborde (int64 llega a ~9.2e18).
+_MAX_DIGITOS_RAPIDOS = 18
+
+
+def _matriz_de_caracteres(lineas):
+    """
+    Convierte una lista de líneas en una matriz (n_lineas x ancho) de códigos UCS-4.
+    Las líneas más cortas quedan rellenas con ceros a la derecha.
+    """
+    arr = np.array(lineas, dtype=str)
+    if arr.dtype.itemsize == 0:
+        return np.zeros((len(lineas), 0), dtype=np.uint32)
+    ancho = arr.dtype.itemsize // 4
+    return arr.view(np.uint32).reshape(len(lineas), ancho)
+
+
+def _a_texto(campo):
+    """Devuelve el campo (matriz de códigos) como array de str sin espacios extremos."""
+    n, ancho = campo.shape
+    if ancho == 0:
+        return np.full(n, '', dtype=object)
+    textos = np.ascontiguousarray(campo).view(f'U{ancho}').ravel()
+    return np.strings.strip(textos)
+
+
+def _a_entero(campo):
+    """
+    Interpreta cada fila del campo como un entero decimal alineado con espacios.
+    Las filas que no son dígitos contiguos (signos, decimales, espacios intermedios,
+    basura) o que tienen más de _MAX_DIGITOS_RAPIDOS dígitos se resuelven con pd.to_numeric sobre esas filas únicamente; las vacías
+    quedan como NA.
+    """
+    n, ancho = campo.shape
+    cols = campo.T.astype(np.int64)
+    digitos = (cols >= 48) & (cols <= 57)
+    relleno = np.isin(cols, _RELLENO)
+
+    valores = np.zeros(n, dtype=np.int64)
+    for j in range(ancho):
+        np.copyto(valores, valores * 10 + cols[j] - 48, where=digitos[j])
+
+    # El relleno solo vale antes del primer dígito y después del último: "1 2" no es 12
+    entre_digitos = np.logical_or.accumulate(digitos, axis=0) & np.logical_or.accumulate(digitos[::-1], axis=0)[::-1]
+    validos = (digitos | relleno).all(axis=0) & digitos.any(axis=0) & ~(relleno & entre_digitos).any(axis=0)
+    # Con más dígitos la acumulación en int64 puede desbordar sin aviso
+    validos &= digitos.sum(axis=0) <= _MAX_DIGITOS_RAPIDOS
+    vacios = relleno.all(axis=0)
+    resto = ~validos & ~vacios
+
+    salida = pd.array(valores, dtype='Int64')
+    if resto.any():
+        # Fallback para los pocos valores que no son enteros simples
+        extra = pd.to_numeric(pd.Series(_a_texto(campo[resto])), errors='coerce').to_numpy(dtype=float)
+        enteros = np.isnan(extra) | ((extra == np.round(extra)) & (np.abs(extra) < 2.0 ** 63))
+        if enteros.all():
+            salida[resto] = pd.array(extra, dtype='Float64').astype('Int64')
+        else:
+            salida = salida.astype('Float64')
+            salida[resto] = extra
+    salida[vacios] = pd.NA
+    return salida
+
+
+def parsear_txt_pedidos(texto):
+    """
+    Parsea el contenido completo de un TXT de pedidos de sucursal en un solo lote.
+
+    Cada línea tiene el formato de ancho fijo definido en COLUMNAS_TXT. Las líneas
+    en blanco se descartan. Retorna un DataFrame con las columnas:
+        CODBARRA (Int64) | TROQUEL (Int64) | DESCRIPCION (category) | CANTIDAD_PEDIDA (Int64/Float64)
+
+    DESCRIPCION es categórica: cada descripción distinta se guarda una sola vez.
+    """
+    lineas = [linea for linea in texto.split('\n') if linea.strip()]
+    matriz = _matriz_de_caracteres(lineas)
+    ancho = matriz.shape[1]
+
+    columnas = {}
+    for nombre, inicio, fin in COLUMNAS_TXT:
+        campo = matriz[:, min(inicio, ancho):ancho if fin is None else min(fin, ancho)]
+        if nombre == 'DESCRIPCION':
+            codigos, descripciones = pd.factorize(_a_texto(campo))
+            columnas[nombre] = pd.Categorical.from_codes(codigos, categories=descripciones)
+        else:
+            columnas[nombre] = _a_entero(campo)
+
+    return pd.DataFrame(columnas)
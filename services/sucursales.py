@@ -0,0 +1,76 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Sucursales que en los TXT de pedidos se informan con otro número: {informada: real}
+ALIAS_SUCURSALES = {32: 26, 34: 27, 33: 28}
+
+# Tabla precalculada para aplicar ALIAS_SUCURSALES sobre arrays: _TABLA_ALIAS[n] = sucursal real
+_TABLA_ALIAS = np.arange(max(ALIAS_SUCURSALES) + 1, dtype=np.int64)
+_TABLA_ALIAS[list(ALIAS_SUCURSALES)] = list(ALIAS_SUCURSALES.values())
+
+_VALORES_ROMANOS = {
+    'I': 1, 'V': 5, 'X': 10,
+    'L': 50, 'C': 100, 'D': 500, 'M': 1000
+}
+
+# Número romano bien formado (I..MMMMCMXCIX), sin repeticiones ni restas inválidas
+_PATRON_ROMANO_VALIDO = re.compile(r'M{0,4}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})', re.IGNORECASE)
+
+# Número romano al final del destino, separado del resto del nombre (ej. 'S. ANTONIOLLI II')
+_PATRON_SUCURSAL = re.compile(r'(?<![A-Z])([IVXLCDM]+)$', re.IGNORECASE)
+
+
+def roman_to_int(roman: str) -> int:
+    """
+    Convierte un número romano en un entero.
+    Soporta símbolos básicos: I, V, X, L, C, D, M.
+    Lanza ValueError si el texto no es un número romano válido.
+    """
+    if not roman or not _PATRON_ROMANO_VALIDO.fullmatch(roman):
+        raise ValueError(f"Número romano inválido: {roman!r}")
+    total = 0
+    roman = roman.upper()  # Asegurarse de que esté en mayúsculas
+    for i in range(len(roman)):
+        # Si el siguiente símbolo es mayor, resta en lugar de sumar
+        if i + 1 < len(roman) and _VALORES_ROMANOS[roman[i]] < _VALORES_ROMANOS[roman[i + 1]]:
+            total -= _VALORES_ROMANOS[roman[i]]
+        else:
+            total += _VALORES_ROMANOS[roman[i]]
+    return total
+
+
+@lru_cache(maxsize=1024)
+def parse_sucursal(destino_str: str) -> int:
+    """
+    Toma un string como 'S. ANTONIOLLI II' y devuelve un entero (2 en este caso).
+    Si no encuentra un número romano válido al final, retorna None.
+    El resultado se cachea: hay pocas decenas de destinos distintos.
+    """
+    match = _PATRON_SUCURSAL.search(destino_str.strip())
+    if match:
+        try:
+            return roman_to_int(match.group(1))
+        except ValueError:
+            return None
+    return None
+
+
+def resolver_sucursales(destinos):
+    """
+    Convierte una Serie de destinos en números de sucursal (Int64, NA si no se reconoce).
+    Cada destino distinto se resuelve una sola vez y el resultado se mapea a todas las filas.
+    """
+    codigos, unicos = pd.factorize(destinos)
+    resueltos = pd.array([parse_sucursal(str(destino)) for destino in unicos] + [None], dtype='Int64')
+    # El código -1 (destino vacío) toma el último elemento, NA
+    return pd.Series(resueltos[codigos], index=destinos.index, name=destinos.name)
+
+
+def aplicar_alias(sucursales):
+    """Reemplaza en un array de enteros las sucursales informadas con alias por la real."""
+    sucursales = np.asarray(sucursales, dtype=np.int64)
+    en_tabla = (sucursales >= 0) & (sucursales < len(_TABLA_ALIAS))
+    return np.where(en_tabla, _TABLA_ALIAS[np.where(en_tabla, sucursales, 0)], sucursales)
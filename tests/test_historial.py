@@ -0,0 +1,46 @@
+import os
+import shutil
+
+from benchmarks.sinteticos import generar_entradas
+from controllers.batch_controller import procesar_lote
+from services.historial import HistorialResultados
+
+
+def _pares(carpeta, cantidad):
+    """Pares ZIP/CSV sintéticos distintos, con nombres distintos, en la misma carpeta."""
+    pares = []
+    for i in range(cantidad):
+        tmp = os.path.join(carpeta, f'gen{i}')
+        os.makedirs(tmp)
+        ruta_zip, ruta_csv = generar_entradas(tmp, 2000, n_sucursales=5, semilla=i)
+        destino_zip = os.path.join(carpeta, f'pedidos{i}.zip')
+        destino_csv = os.path.join(carpeta, f'pedidos{i}.csv')
+        shutil.move(ruta_zip, destino_zip)
+        shutil.move(ruta_csv, destino_csv)
+        pares.append({'zip': destino_zip, 'csv': destino_csv, 'periodo': '2025-03'})
+    return pares
+
+
+def test_dos_pares_en_el_mismo_periodo_se_suman(tmp_path):
+    pares = _pares(str(tmp_path), 2)
+    ruta_db = str(tmp_path / 'historial.db')
+    resumenes = procesar_lote(pares, str(tmp_path / 'salida'), workers=2, ruta_historial=ruta_db)
+    assert [r['estado'] for r in resumenes] == ['ok', 'ok']
+
+    df = HistorialResultados(ruta_db).consultar()
+    assert len(df) == sum(r['filas'] for r in resumenes)
+    assert df.groupby('FUENTE').size().to_dict() == {
+        'pedidos0_reporte.xlsx': resumenes[0]['filas'],
+        'pedidos1_reporte.xlsx': resumenes[1]['filas'],
+    }
+
+
+def test_reprocesar_un_par_reemplaza_solo_sus_filas(tmp_path):
+    pares = _pares(str(tmp_path), 2)
+    ruta_db = str(tmp_path / 'historial.db')
+    resumenes = procesar_lote(pares, str(tmp_path / 'salida'), ruta_historial=ruta_db)
+    procesar_lote(pares[:1], str(tmp_path / 'salida'), ruta_historial=ruta_db)
+
+    df = HistorialResultados(ruta_db).consultar()
+    assert len(df) == sum(r['filas'] for r in resumenes)
+    assert HistorialResultados(ruta_db).periodos() == ['2025-03']
@@ -0,0 +1,78 @@
+import os
+import pickle
+
+import pandas as pd
+
+from benchmarks.sinteticos import generar_pedidos_llegadas
+from services.comparador import comparar_dataframes
+from services.incremental import comparar_incremental
+
+
+def _entradas(semilla=0):
+    return generar_pedidos_llegadas(6, 300, n_productos=500, semilla=semilla)
+
+
+def _igual_al_completo(df_pedidos, df_llegadas, incremental):
+    completo = comparar_dataframes(df_pedidos.copy(), df_llegadas.copy())
+    # El orden del diccionario de PRODUCTO puede variar; los valores no
+    pd.testing.assert_frame_equal(completo, incremental, check_categorical=False)
+
+
+def test_solo_recalcula_las_sucursales_que_cambian(tmp_path):
+    estado = str(tmp_path / 'estado.pkl')
+    df_pedidos, df_llegadas = _entradas()
+    _, recalculadas = comparar_incremental(df_pedidos.copy(), df_llegadas.copy(), estado, huella_llegadas='a')
+    assert recalculadas == [1, 2, 3, 4, 5, 6]
+
+    # Cambian los pedidos de la sucursal 2 (con descripciones que no estaban) y se va la 6
+    otros, _ = _entradas(semilla=1)
+    df_pedidos = pd.concat([
+        df_pedidos[~df_pedidos['SUCURSAL'].isin([2, 6])],
+        otros[otros['SUCURSAL'] == 2].assign(DESCRIPCION=lambda d: 'NUEVO ' + d['DESCRIPCION'].astype(str)),
+    ], ignore_index=True).sort_values('SUCURSAL', kind='stable', ignore_index=True)
+    df_llegadas = df_llegadas[df_llegadas['SUCURSAL'] != 6].reset_index(drop=True)
+
+    incremental, recalculadas = comparar_incremental(df_pedidos.copy(), df_llegadas.copy(), estado)
+    assert recalculadas == [2]
+    _igual_al_completo(df_pedidos, df_llegadas, incremental)
+
+    # Sin cambios no se recalcula nada y solo quedan las partes en uso
+    incremental, recalculadas = comparar_incremental(df_pedidos.copy(), df_llegadas.copy(), estado)
+    assert recalculadas == []
+    _igual_al_completo(df_pedidos, df_llegadas, incremental)
+    assert len(os.listdir(estado + '.partes')) == 5
+
+
+def test_misma_huella_de_llegadas_reusa_sus_hashes(tmp_path):
+    estado = str(tmp_path / 'estado.pkl')
+    df_pedidos, df_llegadas = _entradas()
+    comparar_incremental(df_pedidos.copy(), df_llegadas.copy(), estado, huella_llegadas='a')
+    # Con la misma huella se confía en ella aunque el DataFrame difiera
+    _, recalculadas = comparar_incremental(df_pedidos.copy(), df_llegadas.head(10).copy(), estado,
+                                           huella_llegadas='a')
+    assert recalculadas == []
+    _, recalculadas = comparar_incremental(df_pedidos.copy(), df_llegadas.copy(), estado, huella_llegadas='b')
+    assert recalculadas == []
+
+
+def test_estado_ilegible_recalcula_todo(tmp_path):
+    estado = str(tmp_path / 'estado.pkl')
+    df_pedidos, df_llegadas = _entradas()
+    for contenido in (b'basura', pickle.dumps([1, 2])):
+        with open(estado, 'wb') as f:
+            f.write(contenido)
+        incremental, recalculadas = comparar_incremental(df_pedidos.copy(), df_llegadas.copy(), estado)
+        assert recalculadas == [1, 2, 3, 4, 5, 6]
+        _igual_al_completo(df_pedidos, df_llegadas, incremental)
+
+
+def test_parte_faltante_se_recalcula(tmp_path):
+    estado = str(tmp_path / 'estado.pkl')
+    df_pedidos, df_llegadas = _entradas()
+    comparar_incremental(df_pedidos.copy(), df_llegadas.copy(), estado)
+    carpeta = estado + '.partes'
+    os.remove(os.path.join(carpeta, next(n for n in os.listdir(carpeta) if n.startswith('3-'))))
+
+    incremental, recalculadas = comparar_incremental(df_pedidos.copy(), df_llegadas.copy(), estado)
+    assert recalculadas == [3]
+    _igual_al_completo(df_pedidos, df_llegadas, incremental)
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from benchmarks.bench_parser_txt import parsear_bucle
+from services.parser_txt import parsear_txt_pedidos
+
+
+def _linea(codbarra, troquel, descripcion, cantidad):
+    return f"{codbarra:>13}{troquel:>7}{descripcion:<30}{cantidad}"
+
+
+def _comparar_con_bucle(lineas):
+    texto = '\n'.join(lineas) + '\n'
+    nuevo = parsear_txt_pedidos(texto)
+    anterior = parsear_bucle(texto)
+    for col in ('CODBARRA', 'TROQUEL', 'CANTIDAD_PEDIDA'):
+        pd.testing.assert_series_equal(
+            nuevo[col].astype('Float64'), anterior[col].astype('Float64'), check_names=False
+        )
+
+
+@pytest.mark.parametrize('cantidad', ['12', '  12  ', '1 2', '1\t2', '-3', '+4', '2.5', '2,5', '1e3', 'x', '',
+                                      '999999999999999999', '9223372036854775808', '99999999999999999999'])
+def test_cantidad_igual_que_el_bucle_original(cantidad):
+    _comparar_con_bucle([
+        _linea('7790000000001', '1234567', 'PRODUCTO A', '5'),
+        _linea('7790000000002', '7654321', 'PRODUCTO B', cantidad),
+    ])
+
+
+@pytest.mark.parametrize('codbarra', ['7790 000001', '  7790000001', '779-0000001', '7790000001.0'])
+def test_codbarra_igual_que_el_bucle_original(codbarra):
+    _comparar_con_bucle([
+        _linea('7790000000001', '1234567', 'PRODUCTO A', '5'),
+        _linea(codbarra, '7654321', 'PRODUCTO B', '3'),
+    ])
+
+
+def test_troquel_con_espacio_intermedio_no_se_une():
+    df = parsear_txt_pedidos(_linea('7790000000001', '12 45', 'PRODUCTO A', '5') + '\n')
+    assert df['TROQUEL'].isna().all()
@@ -0,0 +1,38 @@
+import os
+import time
+import zipfile
+
+from controllers.watch_controller import VigilanteCarpeta
+
+
+def _tarea_que_muere(par):
+    """Reemplazo de procesar_par: el worker muere con los pares 'muere', como en un OOM."""
+    if 'muere' in os.path.basename(par['zip']):
+        os._exit(1)
+    return {'zip': par['zip'], 'csv': par['csv'], 'estado': 'ok', 'archivos': []}
+
+
+def _par(carpeta, nombre, fecha):
+    with zipfile.ZipFile(os.path.join(carpeta, f'{nombre} Fecha {fecha}.zip'), 'w') as zip_ref:
+        zip_ref.writestr('vacio.txt', '')
+    with open(os.path.join(carpeta, f'llegadas {fecha}.csv'), 'w') as f:
+        f.write('x\n')
+
+
+def test_sigue_vigilando_si_muere_un_worker(tmp_path):
+    entrada = tmp_path / 'entrada'
+    entrada.mkdir()
+    _par(str(entrada), 'a_muere', '20250301')
+    _par(str(entrada), 'b_sano', '20250302')
+
+    avisos = []
+    vigilante = VigilanteCarpeta(str(entrada), str(tmp_path / 'salida'), workers=1, espera=0,
+                                 avisar=avisos.append)
+    vigilante.tarea = _tarea_que_muere
+    inicio = time.monotonic()
+    vigilante.vigilar(intervalo=0.1, detener=lambda: len(vigilante.terminados) == 2
+                      or time.monotonic() - inicio > 60)
+
+    resultados = [a.split(']')[0] + ']' for a in avisos if a.startswith('[')]
+    assert resultados == ['[error]', '[ok]']
+    assert any('b_sano' in a and a.startswith('[ok]') for a in avisos)
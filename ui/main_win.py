@@ -1,10 +1,11 @@
 import os
 import platform
 import subprocess
+from PyQt5.QtCore import QThread
 from PyQt5.QtWidgets import QMainWindow, QFileDialog, QMessageBox
+from controllers.export_controller import validar_formatos
 from ui.window import Ui_MainWindow  # Asegúrate de que el nombre y ubicación sean correctos
-from controllers.file_controller import leer_csv_desde_fila_11, procesar_zip_a_dataframe
-from controllers.process_controller import procesar
+from ui.worker import ProcesoWorker
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -17,12 +18,31 @@ class MainWindow(QMainWindow):
         self.ui.pushButton_2.clicked.connect(self.select_csv)
         self.ui.pushButton_destination.clicked.connect(self.select_destination)
         self.ui.pushButton_3.clicked.connect(self.process_files)
+        self.ui.pushButton_cancelar.clicked.connect(self.cancel_process)
         
         # Variables para almacenar rutas de archivos
         self.zip_path = None
         self.csv_path = None
         self.dest_path = None
 
+        # Thread y worker del proceso en curso (None si no hay ninguno)
+        self._thread = None
+        self._worker = None
+        # El thread sigue vivo un momento después de la señal final del worker; la
+        # ventana no se puede cerrar hasta que termine (ver closeEvent)
+        self._thread_activo = False
+        self._cerrar_al_terminar = False
+
+        # Sin pyarrow ni fastparquet la opción Parquet queda deshabilitada
+        try:
+            validar_formatos(['parquet'])
+            self._parquet_disponible = True
+        except ValueError as e:
+            self._parquet_disponible = False
+            self.ui.checkBox_parquet.setChecked(False)
+            self.ui.checkBox_parquet.setToolTip(str(e))
+        self.ui.checkBox_parquet.setEnabled(self._parquet_disponible)
+
     def select_zip(self):
         self.zip_path, _ = QFileDialog.getOpenFileName(
             self,
@@ -53,24 +73,121 @@ class MainWindow(QMainWindow):
         if self.dest_path:
             self.ui.lineEdit_destination.setText(self.dest_path)
     
+    def selected_formats(self):
+        """Formatos tildados, con los nombres de export_controller.EXPORTADORES."""
+        checkboxes = {
+            'xlsx': self.ui.checkBox_xlsx,
+            'csv': self.ui.checkBox_csv,
+            'parquet': self.ui.checkBox_parquet,
+            'html': self.ui.checkBox_html,
+        }
+        return [formato for formato, checkbox in checkboxes.items() if checkbox.isChecked()]
+
     def process_files(self):
         if not self.zip_path or not self.csv_path or not self.dest_path:
             QMessageBox.warning(self, "Error", "Debes seleccionar el archivo ZIP, el CSV y el destino para el resultado.")
             return
+        formatos = self.selected_formats()
+        if not formatos:
+            QMessageBox.warning(self, "Error", "Debes elegir al menos un formato para el reporte.")
+            return
         
-        try:
-            dataframes_zip = procesar_zip_a_dataframe(self.zip_path)
-            df_csv = leer_csv_desde_fila_11(self.csv_path)
-            # Procesar y guardar el archivo en la ruta destino seleccionada
-            procesar(dataframes_zip, df_csv, self.dest_path)
-            QMessageBox.information(self, "Proceso finalizado", "El procesamiento se realizó correctamente.")
-            
-            # Abrir la carpeta que contiene el archivo procesado
-            folder = os.path.dirname(self.dest_path)
-            self.open_folder(folder)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Ha ocurrido un error: {str(e)}")
+        # El proceso corre en un QThread para no congelar la ventana
+        self._thread = QThread(self)
+        self._worker = ProcesoWorker(self.zip_path, self.csv_path, self.dest_path, formatos)
+        self._worker.moveToThread(self._thread)
+
+        self._thread.started.connect(self._worker.run)
+        self._worker.progreso.connect(self.on_progress)
+        self._worker.finalizado.connect(self.on_finished)
+        self._worker.cancelado.connect(self.on_cancelled)
+        self._worker.error.connect(self.on_error)
+        for signal in (self._worker.finalizado, self._worker.cancelado, self._worker.error):
+            signal.connect(self._thread.quit)
+        self._thread.finished.connect(self.on_thread_finished)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.finished.connect(self._thread.deleteLater)
+
+        self.set_running(True)
+        self._thread_activo = True
+        self._thread.start()
+
+    def cancel_process(self):
+        if self._worker is not None:
+            self._worker.cancelar()
+            self.ui.pushButton_cancelar.setEnabled(False)
+            self.ui.statusbar.showMessage("Cancelando al terminar la etapa actual...")
+
+    def closeEvent(self, event):
+        """
+        Si hay un proceso en curso pregunta antes de cerrar; al confirmar lo cancela y
+        la ventana se cierra recién en on_thread_finished (destruir el thread corriendo
+        aborta la aplicación). Mientras tanto la ventana sigue respondiendo.
+        """
+        if not self._thread_activo:
+            event.accept()
+            return
+        if not self._cerrar_al_terminar:
+            respuesta = QMessageBox.question(
+                self, "Proceso en curso",
+                "Hay un proceso en curso. ¿Cancelarlo y salir?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if respuesta != QMessageBox.Yes:
+                event.ignore()
+                return
+            self._cerrar_al_terminar = True
+            if self._worker is not None:
+                self._worker.cancelar()
+            self.ui.pushButton_cancelar.setEnabled(False)
+            self.ui.statusbar.showMessage("Cerrando al terminar la etapa actual...")
+        event.ignore()
+
+    def on_thread_finished(self):
+        self._thread_activo = False
+        if self._cerrar_al_terminar:
+            self.close()
+
+    def set_running(self, running):
+        """Habilita o deshabilita los controles según haya un proceso en curso."""
+        for widget in (self.ui.pushButton, self.ui.pushButton_2,
+                       self.ui.pushButton_destination, self.ui.pushButton_3,
+                       self.ui.checkBox_xlsx, self.ui.checkBox_csv, self.ui.checkBox_html):
+            widget.setEnabled(not running)
+        self.ui.checkBox_parquet.setEnabled(not running and self._parquet_disponible)
+        self.ui.pushButton_cancelar.setEnabled(running)
+        self.ui.progressBar.setVisible(running)
+        self.ui.progressBar.setValue(0)
+        if not running:
+            self._thread = None
+            self._worker = None
+
+    def on_progress(self, etapa, actual, total):
+        self.ui.progressBar.setMaximum(max(total, 1))
+        self.ui.progressBar.setValue(actual)
+        self.ui.statusbar.showMessage(f"{etapa} ({actual}/{total})")
+
+    def on_finished(self, tiempos):
+        self.set_running(False)
+        if self._cerrar_al_terminar:
+            return
+        self.ui.statusbar.showMessage(f"Proceso finalizado: {tiempos}")
+        QMessageBox.information(self, "Proceso finalizado", "El procesamiento se realizó correctamente.")
+
+        # Abrir la carpeta que contiene el archivo procesado
+        folder = os.path.dirname(self.dest_path)
+        self.open_folder(folder)
+
+    def on_cancelled(self):
+        self.set_running(False)
+        self.ui.statusbar.showMessage("Proceso cancelado")
+
+    def on_error(self, message):
+        self.set_running(False)
+        if self._cerrar_al_terminar:
+            return
+        self.ui.statusbar.clearMessage()
+        QMessageBox.critical(self, "Error", f"Ha ocurrido un error: {message}")
     
     def open_folder(self, path):
         """Abre la carpeta especificada según el sistema operativo."""
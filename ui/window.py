@@ -12,7 +12,7 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
         MainWindow.setObjectName("Reporter de Faltas")
-        MainWindow.resize(411, 340)  # Aumentamos la altura para incluir nuevos controles
+        MainWindow.resize(411, 370)  # Aumentamos la altura para incluir nuevos controles
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         
@@ -49,10 +49,36 @@ class Ui_MainWindow(object):
         self.pushButton_destination.setGeometry(QtCore.QRect(290, 200, 81, 23))
         self.pushButton_destination.setObjectName("pushButton_destination")
         
-        # Botón para procesar
+        # Formatos del reporte (se pueden elegir varios)
+        self.checkBox_xlsx = QtWidgets.QCheckBox(self.centralwidget)
+        self.checkBox_xlsx.setGeometry(QtCore.QRect(40, 230, 75, 20))
+        self.checkBox_xlsx.setObjectName("checkBox_xlsx")
+        self.checkBox_xlsx.setChecked(True)
+        self.checkBox_csv = QtWidgets.QCheckBox(self.centralwidget)
+        self.checkBox_csv.setGeometry(QtCore.QRect(120, 230, 65, 20))
+        self.checkBox_csv.setObjectName("checkBox_csv")
+        self.checkBox_parquet = QtWidgets.QCheckBox(self.centralwidget)
+        self.checkBox_parquet.setGeometry(QtCore.QRect(190, 230, 90, 20))
+        self.checkBox_parquet.setObjectName("checkBox_parquet")
+        self.checkBox_html = QtWidgets.QCheckBox(self.centralwidget)
+        self.checkBox_html.setGeometry(QtCore.QRect(285, 230, 86, 20))
+        self.checkBox_html.setObjectName("checkBox_html")
+
+        # Barra de progreso del proceso en curso
+        self.progressBar = QtWidgets.QProgressBar(self.centralwidget)
+        self.progressBar.setGeometry(QtCore.QRect(40, 260, 331, 20))
+        self.progressBar.setObjectName("progressBar")
+        self.progressBar.setValue(0)
+        self.progressBar.setVisible(False)
+
+        # Botones para procesar y cancelar
         self.pushButton_3 = QtWidgets.QPushButton(self.centralwidget)
-        self.pushButton_3.setGeometry(QtCore.QRect(130, 260, 141, 23))
+        self.pushButton_3.setGeometry(QtCore.QRect(60, 290, 141, 23))
         self.pushButton_3.setObjectName("pushButton_3")
+        self.pushButton_cancelar = QtWidgets.QPushButton(self.centralwidget)
+        self.pushButton_cancelar.setGeometry(QtCore.QRect(210, 290, 141, 23))
+        self.pushButton_cancelar.setObjectName("pushButton_cancelar")
+        self.pushButton_cancelar.setEnabled(False)
         
         MainWindow.setCentralWidget(self.centralwidget)
         self.statusbar = QtWidgets.QStatusBar(MainWindow)
@@ -71,4 +97,9 @@ class Ui_MainWindow(object):
         self.pushButton_2.setText(_translate("MainWindow", "Seleccionar"))
         self.label_destination.setText(_translate("MainWindow", "Selecciona el destino del archivo procesado:"))
         self.pushButton_destination.setText(_translate("MainWindow", "Seleccionar"))
+        self.checkBox_xlsx.setText(_translate("MainWindow", "Excel"))
+        self.checkBox_csv.setText(_translate("MainWindow", "CSV"))
+        self.checkBox_parquet.setText(_translate("MainWindow", "Parquet"))
+        self.checkBox_html.setText(_translate("MainWindow", "HTML"))
         self.pushButton_3.setText(_translate("MainWindow", "Procesar"))
+        self.pushButton_cancelar.setText(_translate("MainWindow", "Cancelar"))
@@ -0,0 +1,61 @@
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+
+class ProcesoWorker(QObject):
+    """
+    Corre process_controller.ejecutar fuera del thread de la interfaz.
+    Se mueve a un QThread y se comunica con la ventana solo mediante señales.
+    """
+    progreso = pyqtSignal(str, int, int)   # etapa, actual, total
+    finalizado = pyqtSignal(str)           # resumen de tiempos por etapa
+    cancelado = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, zip_path, csv_path, dest_path, formatos=('xlsx',)):
+        super().__init__()
+        self.zip_path = zip_path
+        self.csv_path = csv_path
+        self.dest_path = dest_path
+        self.formatos = formatos
+        self._cancelar = False
+
+    def cancelar(self):
+        """Pide la cancelación; se hace efectiva al terminar la etapa en curso."""
+        self._cancelar = True
+
+    @pyqtSlot()
+    def run(self):
+        # pandas, numpy y xlsxwriter se importan recién acá (en el thread del worker)
+        # para que la ventana aparezca sin esperar a cargar el stack de datos.
+        try:
+            from controllers.process_controller import ProcesoCancelado, ejecutar
+            from services.cache import CacheParseo
+            from services.instrumentacion import Instrumentacion
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+
+        # Si no se puede crear la carpeta de cache se procesa sin cache
+        try:
+            cache = CacheParseo()
+        except OSError:
+            cache = None
+
+        instrumentacion = Instrumentacion()
+        try:
+            ejecutar(
+                self.zip_path,
+                self.csv_path,
+                self.dest_path,
+                progreso=self.progreso.emit,
+                cancelado=lambda: self._cancelar,
+                cache=cache,
+                instrumentacion=instrumentacion,
+                formatos=self.formatos,
+            )
+        except ProcesoCancelado:
+            self.cancelado.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+        else:
+            self.finalizado.emit(instrumentacion.texto())